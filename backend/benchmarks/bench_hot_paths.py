@@ -0,0 +1,78 @@
+"""
+Микробенчмарки кода, который сервер выполняет на каждую строку: сумма оценок,
+сборка ответа группы и Pydantic-модель StudentResponse. БД и сеть не нужны.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --sizes 100 10000 --only student_total_score
+    python -m benchmarks.bench_hot_paths --save-baseline benchmarks/baseline_hot_paths.json
+    python -m benchmarks.bench_hot_paths --baseline benchmarks/baseline_hot_paths.json
+"""
+import random
+import sys
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from benchmarks import harness
+from src.routers.group import _build_group_payload
+from src.schemas.student import StudentResponse
+from src.utils import student_total_score
+
+SCORES = ["5", "4", "3", "2", "н", " 5", None]
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+students_adapter = TypeAdapter(list[StudentResponse])
+
+
+def make_students(count: int) -> list[SimpleNamespace]:
+    rng = random.Random(count)
+    students = []
+    for student_id in range(1, count + 1):
+        scores = [rng.choice(SCORES) for _ in range(3)]
+        students.append(
+            SimpleNamespace(
+                id=student_id,
+                fio=f"Студентов Студент Студентович {student_id}",
+                score_1=scores[0] and scores[0].strip(),
+                score_2=scores[1] and scores[1].strip(),
+                score_3=scores[2] and scores[2].strip(),
+                group_id=1,
+                total_score=rng.randint(0, 15),
+            )
+        )
+    return students
+
+
+def bench_student_total_score(size: int):
+    rng = random.Random(size)
+    rows = [(rng.choice(SCORES), rng.choice(SCORES), rng.choice(SCORES)) for _ in range(size)]
+    return lambda: [student_total_score(*row) for row in rows]
+
+
+def bench_build_group_payload(size: int):
+    group = SimpleNamespace(id=1, name="ИС-101", control_sum=9, students_quantity=size, excluded_students_quantity=0)
+    students = make_students(size)
+    return lambda: _build_group_payload(group, students=students)
+
+
+def bench_student_response_validate(size: int):
+    students = make_students(size)
+    return lambda: [StudentResponse.model_validate(student) for student in students]
+
+
+def bench_student_response_dump_json(size: int):
+    models = [StudentResponse.model_validate(student) for student in make_students(size)]
+    return lambda: students_adapter.dump_json(models)
+
+
+BENCHMARKS = {
+    "student_total_score": bench_student_total_score,
+    "build_group_payload": bench_build_group_payload,
+    "StudentResponse.model_validate": bench_student_response_validate,
+    "StudentResponse.dump_json": bench_student_response_dump_json,
+}
+
+
+if __name__ == "__main__":
+    sys.exit(harness.main(BENCHMARKS, __doc__, DEFAULT_SIZES))
@@ -0,0 +1,105 @@
+"""
+Сравнение сериализации списка студентов: прежний путь (Pydantic-модель на строку
+и повторная проверка по response_model, как делает FastAPI) и быстрый путь
+(словари -> байты через src.serialization.dumps).
+
+Ускорение — отношение нс/эл. строк legacy и fast одного размера.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --sizes 10000 100000 --repeat 30
+    python -m benchmarks.bench_serialization --baseline benchmarks/baseline_serialization.json
+"""
+import json
+import random
+import sys
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from benchmarks import harness
+from src.schemas.pagination import Page
+from src.schemas.student import StudentWithGroupResponse
+from src.serialization import dumps, orjson, student_payload
+
+SCORES = ["5", "4", "3", "2", "н", None]
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def make_students(count: int) -> list:
+    rng = random.Random(count)
+    groups = [SimpleNamespace(id=i, name=f"ИС-{i:03d}") for i in range(1, 101)]
+    students = []
+    for student_id in range(1, count + 1):
+        group = rng.choice(groups)
+        students.append(
+            SimpleNamespace(
+                id=student_id,
+                fio=f"Студентов Студент {student_id}",
+                score_1=rng.choice(SCORES),
+                score_2=rng.choice(SCORES),
+                score_3=rng.choice(SCORES),
+                total_score=rng.randint(0, 15),
+                group_id=group.id,
+                group=group,
+            )
+        )
+    return students
+
+
+page_adapter = TypeAdapter(Page[StudentWithGroupResponse])
+
+
+def legacy_path(students: list) -> bytes:
+    """Модель на строку, затем проверка response_model и json.dumps (как в FastAPI)"""
+    items = [
+        StudentWithGroupResponse(
+            id=student.id,
+            fio=student.fio,
+            score_1=student.score_1,
+            score_2=student.score_2,
+            score_3=student.score_3,
+            total_score=student.total_score,
+            group_id=student.group_id,
+            group_name=student.group.name,
+        )
+        for student in students
+    ]
+    content = {"items": [item.model_dump() for item in items], "next_cursor": None}
+    value = page_adapter.validate_python(content)
+    return json.dumps(
+        page_adapter.dump_python(value, mode="json"),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_path(students: list) -> bytes:
+    items = []
+    for student in students:
+        payload = student_payload(student)
+        payload["group_name"] = student.group.name
+        items.append(payload)
+    return dumps({"items": items, "next_cursor": None})
+
+
+def _bench(path):
+    def benchmark(size: int):
+        students = make_students(size)
+        # Оба пути должны давать одинаковый JSON
+        assert json.loads(legacy_path(students[:100])) == json.loads(fast_path(students[:100]))
+        return lambda: path(students)
+
+    return benchmark
+
+
+BENCHMARKS = {
+    "serialization.legacy": _bench(legacy_path),
+    "serialization.fast": _bench(fast_path),
+}
+
+
+if __name__ == "__main__":
+    print(f"Кодировщик быстрого пути: {'orjson' if orjson is not None else 'pydantic_core.to_json'}")
+    sys.exit(harness.main(BENCHMARKS, __doc__, DEFAULT_SIZES))
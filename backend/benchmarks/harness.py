@@ -0,0 +1,161 @@
+"""
+Общий запуск микробенчмарков: время на нескольких размерах входа, выделение памяти
+через tracemalloc и сравнение с сохраненным базовым прогоном.
+
+Бенчмарк — функция, которая принимает размер и возвращает вызываемый объект без аргументов,
+обрабатывающий вход этого размера (подготовка данных в замер не входит).
+
+Время сравнивается по лучшему замеру, но на общей или загруженной машине оно все равно
+заметно колеблется: базовый прогон и проверку делайте на одной машине, в CI задайте
+--tolerance с запасом. Пиковая память от нагрузки не зависит и проверяется строже.
+
+Тот же файл лежит в windows/benchmarks/harness.py: сервер и клиент собираются и поставляются
+отдельно, общего пакета у них нет. Копии держатся одинаковыми (кроме этой строки пути),
+чтобы отчеты и базовые прогоны обеих частей имели один формат; правьте обе сразу.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+# Допустимое ухудшение относительно базового прогона: время и пиковая память
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_MEMORY_TOLERANCE = 0.1
+# Замер короче этого повторяется в цикле, иначе у малых размеров шум таймера больше результата
+MIN_SAMPLE_MS = 5.0
+
+Benchmark = Callable[[int], Callable[[], object]]
+
+
+def measure(run: Callable[[], object], repeat: int) -> list[float]:
+    """Время одного прогона в мс, repeat замеров (после прогрева)"""
+    started = time.perf_counter()
+    run()
+    warmup_ms = (time.perf_counter() - started) * 1000
+    loops = max(int(MIN_SAMPLE_MS / warmup_ms), 1) if warmup_ms else 1000
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(loops):
+                run()
+            timings.append((time.perf_counter() - started) * 1000 / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return timings
+
+
+def measure_memory(run: Callable[[], object]) -> tuple[int, int]:
+    """Пиковый объем памяти за один прогон и число блоков, занятых его результатом (tracemalloc)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run()
+        peak = tracemalloc.get_traced_memory()[1]
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, blocks
+
+
+def percentile(timings: list[float], q: int) -> float:
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[q - 1]
+
+
+def run_benchmarks(benchmarks: dict[str, Benchmark], sizes: list[int], repeat: int) -> dict:
+    results = {}
+    print(f"{'бенчмарк':<32} {'размер':>8} {'p50, мс':>10} {'p95, мс':>10} {'мин. нс/эл.':>11} {'пик, КиБ':>10} {'блоков':>9}")
+    for name, benchmark in benchmarks.items():
+        for size in sizes:
+            run = benchmark(size)
+            timings = measure(run, repeat)
+            peak, blocks = measure_memory(run)
+            # Сравнение по лучшему замеру: он меньше всего зависит от фоновой нагрузки машины
+            best = min(timings)
+            result = {
+                "size": size,
+                "min_ms": round(best, 4),
+                "p50_ms": round(percentile(timings, 50), 4),
+                "p95_ms": round(percentile(timings, 95), 4),
+                "ns_per_item": round(best * 1_000_000 / size, 1),
+                "peak_bytes": peak,
+                "retained_blocks": blocks,
+            }
+            results[f"{name}@{size}"] = result
+            print(
+                f"{name:<32} {size:>8} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+                f"{result['ns_per_item']:>11.1f} {peak / 1024:>10.1f} {blocks:>9}"
+            )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float) -> list[str]:
+    """Регрессии: время на элемент или пиковая память выросли больше допустимого"""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        time_change = current["ns_per_item"] / base["ns_per_item"] - 1 if base["ns_per_item"] else 0.0
+        memory_change = current["peak_bytes"] / base["peak_bytes"] - 1 if base["peak_bytes"] else 0.0
+        if time_change > tolerance:
+            regressions.append(f"{key}: время {base['ns_per_item']} → {current['ns_per_item']} нс/эл. ({time_change:+.0%})")
+        if memory_change > memory_tolerance:
+            regressions.append(f"{key}: память {base['peak_bytes']} → {current['peak_bytes']} байт ({memory_change:+.0%})")
+    return regressions
+
+
+def main(benchmarks: dict[str, Benchmark], description: str, default_sizes: list[int]) -> int:
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", nargs="+", choices=list(benchmarks), help="Запустить только эти бенчмарки")
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON базового прогона: код возврата 1 при регрессии")
+    parser.add_argument("--save-baseline", help="Сохранить прогон как базовый")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Допустимый рост времени, доля")
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE, help="Допустимый рост пиковой памяти, доля"
+    )
+    args = parser.parse_args()
+
+    selected = {name: benchmarks[name] for name in args.only} if args.only else benchmarks
+    results = run_benchmarks(selected, args.sizes, args.repeat)
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"Сохранено: {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline["meta"].get("python") != report["meta"]["python"]:
+            print("Внимание: базовый прогон сделан на другой версии Python", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.tolerance, args.memory_tolerance)
+        if regressions:
+            print("\nРегрессии:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nРегрессий нет")
+    return 0
@@ -0,0 +1,5 @@
+# Пользователь, которого создает loadtest.seed и под которым работает loadtest.run
+LOGIN = "loadtest"
+PASSWORD = "loadtest"
+
+SCORES = ["5", "4", "3", "2", "н", None]
@@ -0,0 +1,294 @@
+"""
+Нагрузочный тест HTTP API: смесь реальных сценариев клиента с заданной конкурентностью.
+
+Каждый из --concurrency виртуальных пользователей в цикле выбирает сценарий по весам
+и выполняет его; запросы первых --warmup секунд не учитываются. Итог (пропускная
+способность, p50/p95/p99, доля ошибок по сценариям) пишется в JSON и, если задан
+--baseline, сравнивается с сохраненным прогоном.
+
+Запуск из каталога backend (сервер и данные — см. loadtest/README.md):
+    python -m loadtest.run --concurrency 32 --duration 60
+    python -m loadtest.run --baseline loadtest/baseline.json
+    python -m loadtest.run --save-baseline loadtest/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from loadtest.common import LOGIN, PASSWORD, SCORES
+
+SEARCH_FRAGMENTS = ["Студент", "00", "12", "345", "Нагрузочный", "9"]
+
+# Сценарий -> вес: примерная доля действий преподавателя в приложении
+DEFAULT_MIX = {
+    "login": 2,
+    "list_groups": 20,
+    "group_detail": 30,
+    "grade_edit": 15,
+    "list_students": 33,
+}
+
+# Допустимое ухудшение относительно базового прогона
+DEFAULT_TOLERANCE = 0.15
+ERROR_RATE_TOLERANCE = 0.01
+
+
+class Dataset:
+    """Идентификаторы групп и студентов для запросов, загружаются перед прогоном"""
+
+    def __init__(self, group_ids: list[int], student_ids: list[int], students_total: int, groups_total: int):
+        self.group_ids = group_ids
+        self.student_ids = student_ids
+        self.students_total = students_total
+        self.groups_total = groups_total
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, dataset: Dataset, token: str, mix: dict[str, int], seed: int):
+        self.client = client
+        self.dataset = dataset
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.rng = random.Random(seed)
+        self.recording = False
+        self.latencies: dict[str, list[float]] = {name: [] for name in self.names}
+        self.errors: dict[str, int] = {name: 0 for name in self.names}
+        self.statuses: dict[str, dict[str, int]] = {name: {} for name in self.names}
+
+    async def login(self) -> httpx.Response:
+        return await self.client.post("/api/auth/token", data={"username": LOGIN, "password": PASSWORD})
+
+    async def list_groups(self) -> httpx.Response:
+        return await self.client.get("/api/groups", params={"limit": 100}, headers=self.headers)
+
+    async def group_detail(self) -> httpx.Response:
+        group_id = self.rng.choice(self.dataset.group_ids)
+        return await self.client.get(f"/api/groups/{group_id}", headers=self.headers)
+
+    async def grade_edit(self) -> httpx.Response:
+        student_id = self.rng.choice(self.dataset.student_ids)
+        body = {"field": f"score_{self.rng.randint(1, 3)}", "value": self.rng.choice(SCORES)}
+        return await self.client.patch(f"/api/students/{student_id}", json=body, headers=self.headers)
+
+    async def list_students(self) -> httpx.Response:
+        params: dict = {"limit": 100}
+        variant = self.rng.randrange(4)
+        if variant == 1:
+            params["q"] = self.rng.choice(SEARCH_FRAGMENTS)
+        elif variant == 2:
+            params["status"] = self.rng.choice(["allowed", "notAllowed"])
+        elif variant == 3:
+            params["group_id"] = self.rng.choice(self.dataset.group_ids)
+        return await self.client.get("/api/students", params=params, headers=self.headers)
+
+    async def _user(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(self.names, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await getattr(self, name)()
+                status = str(response.status_code)
+                failed = response.status_code >= 400
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                failed = True
+            elapsed = time.perf_counter() - started
+            if not self.recording:
+                continue
+            self.latencies[name].append(elapsed * 1000)
+            self.statuses[name][status] = self.statuses[name].get(status, 0) + 1
+            if failed:
+                self.errors[name] += 1
+
+    async def run(self, concurrency: int, duration: float, warmup: float) -> float:
+        """Возвращает длительность измеряемой части прогона в секундах"""
+        deadline = time.perf_counter() + warmup + duration
+        users = [asyncio.create_task(self._user(deadline)) for _ in range(concurrency)]
+        await asyncio.sleep(warmup)
+        self.recording = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*users)
+        return time.perf_counter() - measured_from
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    requests = len(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def load_dataset(client: httpx.AsyncClient, headers: dict, sample_size: int) -> Dataset:
+    me = (await client.get("/api/users/me", headers=headers)).raise_for_status().json()
+    groups = (await client.get("/api/groups", params={"unpaged": True}, headers=headers)).raise_for_status().json()
+    group_ids = [group["id"] for group in groups["items"]]
+    if not group_ids:
+        raise SystemExit("В БД нет групп: сначала запустите python -m loadtest.seed")
+
+    student_ids: list[int] = []
+    cursor = None
+    while len(student_ids) < sample_size:
+        params = {"limit": 1000} if cursor is None else {"limit": 1000, "cursor": cursor}
+        page = (await client.get("/api/students", params=params, headers=headers)).raise_for_status().json()
+        student_ids.extend(student["id"] for student in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    return Dataset(group_ids, student_ids[:sample_size], me["students_quantity"], me["groups_quantity"])
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Регрессии относительно базового прогона: p95 выше, rps ниже допустимого или больше ошибок"""
+    regressions = []
+    if report["meta"]["dataset"] != baseline["meta"]["dataset"] or (
+        report["meta"]["concurrency"] != baseline["meta"]["concurrency"]
+    ):
+        print("Внимание: размер данных или конкурентность отличаются от базового прогона", file=sys.stderr)
+
+    print(f"\n{'сценарий':<15} {'p95, мс':>18} {'rps':>20} {'ошибки':>16}")
+    for name, current in {**report["scenarios"], "total": report["total"]}.items():
+        base = baseline["scenarios"].get(name) if name != "total" else baseline["total"]
+        if not base or not current["requests"]:
+            continue
+        p95_change = current["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = current["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        print(
+            f"{name:<15} {base['p95_ms']:>7.1f} → {current['p95_ms']:<7.1f}{p95_change:>+6.0%} "
+            f"{base['rps']:>7.1f} → {current['rps']:<7.1f}{rps_change:>+6.0%} "
+            f"{base['error_rate']:>6.2%} → {current['error_rate']:<6.2%}"
+        )
+        if p95_change > tolerance:
+            regressions.append(f"{name}: p95 вырос на {p95_change:.0%}")
+        if rps_change < -tolerance:
+            regressions.append(f"{name}: rps упал на {-rps_change:.0%}")
+        if current["error_rate"] > base["error_rate"] + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{name}: доля ошибок {current['error_rate']:.2%}")
+    return regressions
+
+
+def parse_mix(values: list[str]) -> dict[str, int]:
+    mix = dict(DEFAULT_MIX)
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Ожидается сценарий=вес, сценарии: {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+async def run(args: argparse.Namespace) -> int:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        token_response = await client.post("/api/auth/token", data={"username": LOGIN, "password": PASSWORD})
+        if token_response.status_code != 200:
+            print("Не удалось войти: запустите python -m loadtest.seed", file=sys.stderr)
+            return 2
+        token = token_response.json()["access_token"]
+        dataset = await load_dataset(client, {"Authorization": f"Bearer {token}"}, args.sample_students)
+
+        mix = parse_mix(args.mix)
+        test = LoadTest(client, dataset, token, mix, args.seed)
+        print(
+            f"Прогон: {args.concurrency} пользователей, {args.duration:.0f} с (+{args.warmup:.0f} с разогрева), "
+            f"данные: групп {dataset.groups_total}, студентов {dataset.students_total}"
+        )
+        elapsed = await test.run(args.concurrency, args.duration, args.warmup)
+
+    scenarios = {name: summarize(test.latencies[name], test.errors[name], elapsed) for name in mix}
+    for name in mix:
+        scenarios[name]["statuses"] = test.statuses[name]
+    all_latencies = [latency for name in mix for latency in test.latencies[name]]
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "warmup_s": args.warmup,
+            "mix": mix,
+            "dataset": {"groups": dataset.groups_total, "students": dataset.students_total},
+        },
+        "scenarios": scenarios,
+        "total": summarize(all_latencies, sum(test.errors.values()), elapsed),
+    }
+
+    print(f"\n{'сценарий':<15} {'запросов':>9} {'rps':>8} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'ошибки':>8}")
+    for name, summary in {**scenarios, "total": report["total"]}.items():
+        print(
+            f"{name:<15} {summary['requests']:>9} {summary['rps']:>8.1f} {summary['p50_ms']:>9.1f} "
+            f"{summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} {summary['error_rate']:>8.2%}"
+        )
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nОтчет: {output}")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Базовый прогон сохранен: {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nРегрессии:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nРегрессий нет")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=60, help="Длительность измерения, с")
+    parser.add_argument("--warmup", type=float, default=5, help="Разогрев без учета, с")
+    parser.add_argument("--timeout", type=float, default=30, help="Таймаут запроса, с")
+    parser.add_argument("--mix", nargs="*", default=[], help="Веса сценариев, например grade_edit=30 login=0")
+    parser.add_argument("--sample-students", type=int, default=5000, help="Сколько id студентов взять для правок")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="loadtest/results/latest.json")
+    parser.add_argument("--baseline", help="JSON базового прогона для сравнения")
+    parser.add_argument("--save-baseline", help="Сохранить этот прогон как базовый")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Допустимое ухудшение, доля")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
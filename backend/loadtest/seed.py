@@ -0,0 +1,115 @@
+"""
+Заполнение локальной БД для нагрузочного теста: группы, студенты и пользователь.
+
+Данные детерминированы (--seed), поэтому прогоны на одном размере сравнимы между собой.
+Группы и студенты загружаются через COPY; счетчики и версии пересчитываются в конце.
+
+Запуск из каталога backend (БД — из DATABASE_URL / .env, как у приложения):
+    python -m loadtest.seed --students 100000 --reset
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from sqlalchemy import text
+
+from loadtest.common import LOGIN, PASSWORD, SCORES
+from src.crud import counters as counters_crud
+from src.database import AsyncSessionLocal, create_tables, engine
+from src.utils import get_password_hash
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+STUDENTS_PER_GROUP = 25
+COPY_BATCH_SIZE = 50_000
+
+
+def parse_size(value: str) -> int:
+    return SIZES[value.lower()] if value.lower() in SIZES else int(value)
+
+
+def student_records(rng: random.Random, first_group_id: int, groups: int, students: int):
+    for number in range(1, students + 1):
+        yield (
+            f"Нагрузочный Студент {number:07d}",
+            rng.choice(SCORES),
+            rng.choice(SCORES),
+            rng.choice(SCORES),
+            first_group_id + rng.randrange(groups),
+        )
+
+
+async def seed(students: int, reset: bool, seed_value: int) -> int:
+    rng = random.Random(seed_value)
+    groups = max(students // STUDENTS_PER_GROUP, 1)
+    await create_tables()
+
+    async with engine.connect() as connection:
+        existing = (await connection.execute(text("SELECT count(*) FROM groups"))).scalar_one()
+        if existing and not reset:
+            print(f"В БД уже есть группы ({existing}). Для перезаписи данных запустите с --reset", file=sys.stderr)
+            return 1
+
+    started = time.perf_counter()
+    async with engine.begin() as connection:
+        if reset:
+            # Отдельная БД для нагрузочного теста: журнал изменений прежних данных не нужен
+            await connection.execute(text("TRUNCATE groups, students, changes RESTART IDENTITY CASCADE"))
+        raw = await connection.get_raw_connection()
+        asyncpg_connection = raw.driver_connection
+
+        await asyncpg_connection.copy_records_to_table(
+            "groups",
+            records=[(f"НТ-{number:05d}", rng.randint(6, 12)) for number in range(1, groups + 1)],
+            columns=["name", "control_sum"],
+        )
+        first_group_id = await asyncpg_connection.fetchval("SELECT min(id) FROM groups")
+
+        batch = []
+        for record in student_records(rng, first_group_id, groups, students):
+            batch.append(record)
+            if len(batch) >= COPY_BATCH_SIZE:
+                await asyncpg_connection.copy_records_to_table(
+                    "students", records=batch, columns=["fio", "score_1", "score_2", "score_3", "group_id"]
+                )
+                batch = []
+        if batch:
+            await asyncpg_connection.copy_records_to_table(
+                "students", records=batch, columns=["fio", "score_1", "score_2", "score_3", "group_id"]
+            )
+
+        await connection.execute(
+            text(
+                "INSERT INTO users (login, password_hash, fio, is_active) VALUES (:login, :hash, :fio, true) "
+                "ON CONFLICT (login) DO UPDATE SET password_hash = excluded.password_hash, is_active = true"
+            ),
+            {"login": LOGIN, "hash": get_password_hash(PASSWORD), "fio": "Нагрузочный тест"},
+        )
+
+    async with AsyncSessionLocal() as db:
+        # Счетчики групп, количества и версии данных (ETag и кэш ответов) после COPY
+        await counters_crud.repair_counters(db)
+    async with engine.begin() as connection:
+        await connection.execute(text("ANALYZE groups"))
+        await connection.execute(text("ANALYZE students"))
+    await engine.dispose()
+
+    print(
+        f"Загружено: групп {groups}, студентов {students} за {time.perf_counter() - started:.1f} с. "
+        f"Пользователь: {LOGIN} / {PASSWORD}"
+    )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=parse_size, default=SIZES["100k"], help="1k, 100k, 1m или число")
+    parser.add_argument("--reset", action="store_true", help="Удалить существующие группы, студентов и журнал изменений")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора данных")
+    args = parser.parse_args()
+    return asyncio.run(seed(args.students, args.reset, args.seed))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,53 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.cache import principal_cache
 from src.config import settings
 from src.crud import user as user_crud
 from src.database import get_db
 from src.schemas.user import UserCreate, UserResponse
-from src.utils import verify_password
+from src.utils import password_hasher
 
 router = APIRouter()
 
 # OAuth2 схема для получения токена
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Снимок пользователя для авторизации запросов (без привязки к сессии БД)"""
+    id: int
+    login: str
+    fio: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            login=user.login,
+            fio=user.fio,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class Principal(NamedTuple):
+    """Запись кэша проверенного токена"""
+    claims: dict
+    user: UserSnapshot
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создает JWT токен"""
     to_encode = data.copy()
@@ -37,15 +68,22 @@ async def authenticate_user(db: AsyncSession, login: str, password: str):
     user = await user_crud.get_user_by_login(db, login)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await password_hasher.verify(password, user.password_hash):
         return None
     return user
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-):
-    """Получает текущего пользователя из JWT токена"""
+) -> UserSnapshot:
+    """
+    Получает текущего пользователя из JWT токена.
+    Проверенные токены кэшируются, поэтому повторные запросы не обращаются к БД.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal.user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -65,10 +103,14 @@ async def get_current_user(
         raise credentials_exception
     
     user = await user_crud.get_user_by_login(db, login)
-    if user is None:
+    if user is None or not user.is_active:
         raise credentials_exception
     
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    # Запись не должна пережить сам токен
+    token_ttl = payload["exp"] - time.time() if "exp" in payload else None
+    principal_cache.set(token, Principal(claims=payload, user=snapshot), ttl=token_ttl)
+    return snapshot
 
 @router.post("/token",
     summary="Получить токен доступа",
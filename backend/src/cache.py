@@ -0,0 +1,163 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from src.config import settings
+
+
+class TTLCache:
+    """Ограниченный по размеру LRU-кэш с временем жизни записей (в пределах одного воркера)"""
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Выключенный кэш ничего не хранит и всегда дает промах
+        self.enabled = enabled
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self.enabled:
+            return None
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any | None:
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Удаляет записи, значения которых удовлетворяют условию. Возвращает число удаленных."""
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResponseCache:
+    """
+    LRU-кэш ответов, ограниченный суммарным размером в байтах (в пределах одного воркера).
+    Все записи относятся к одной версии данных: запись с более новой версией сбрасывает
+    кэш целиком, запрос со старой версией — промах.
+    """
+
+    # Примерный расход памяти на запись помимо самого значения (ключ, узел OrderedDict)
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.version = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data: OrderedDict[Hashable, tuple[int, Any]] = OrderedDict()
+
+    def get(self, version: int, key: Hashable) -> Any | None:
+        entry = self._data.get(key) if version == self.version else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, version: int, key: Hashable, value: Any, size: int | None = None) -> None:
+        if version > self.version:
+            self.invalidate(version)
+        elif version < self.version:
+            return
+        size = (len(value) if size is None else size) + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        previous = self._data.pop(key, None)
+        if previous is not None:
+            self.size -= previous[0]
+        self._data[key] = (size, value)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (evicted_size, _) = self._data.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, version: int) -> None:
+        """Данные изменились: записи предыдущих версий больше не нужны"""
+        if version <= self.version:
+            return
+        self.version = version
+        if self._data:
+            self.invalidations += 1
+        self._data.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._data),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Проверенные JWT-токены: token -> (claims, снимок пользователя).
+# Включается, пока слушатель LISTEN (src/events.py) подключен: без него воркер не узнает
+# об изменениях пользователей в других воркерах.
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS, enabled=False)
+
+
+def invalidate_user_principals(*logins: str) -> None:
+    """Сбрасывает закэшированные токены пользователей этого воркера (смена логина/ФИО)"""
+    login_set = set(logins)
+    principal_cache.discard_where(lambda principal: principal.user.login in login_set)
+
+
+def on_principals_notify(connection, pid, channel, payload) -> None:
+    """Уведомление crud.user.notify_principals_changed из любого воркера: JSON-список логинов"""
+    try:
+        logins = json.loads(payload)
+    except ValueError:
+        principal_cache.clear()
+        return
+    invalidate_user_principals(*logins)
+
+
+def set_principal_cache_enabled(enabled: bool) -> None:
+    principal_cache.enabled = enabled
+    if not enabled:
+        principal_cache.clear()
+
+
+# Готовые тела ответов по версии данных (см. src/data_version.py)
+response_cache = ResponseCache(max_bytes=settings.RESPONSE_CACHE_MAX_BYTES)
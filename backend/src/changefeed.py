@@ -0,0 +1,41 @@
+"""Сборка ответа журнала изменений (GET /api/changes и события /api/events)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud import changes as changes_crud
+from src.crud import group as group_crud
+from src.crud import student as student_crud
+from src.serialization import student_payload
+
+
+async def build_changes_payload(db: AsyncSession, since: int, limit: int) -> dict:
+    """Текущее состояние сущностей, измененных после since, и tombstones удаленных."""
+    payload = {
+        "groups": [],
+        "students": [],
+        "deleted_groups": [],
+        "deleted_students": [],
+        "last_seq": since,
+        "has_more": False,
+    }
+    entities = await changes_crud.list_changed_entities(db, since, limit + 1)
+    payload["has_more"] = len(entities) > limit
+    entities = entities[:limit]
+    if not entities:
+        return payload
+    payload["last_seq"] = entities[-1].seq
+
+    group_ids = [entity.entity_id for entity in entities if entity.entity == changes_crud.GROUP]
+    student_ids = [entity.entity_id for entity in entities if entity.entity == changes_crud.STUDENT]
+
+    if group_ids:
+        groups = await group_crud.list_groups_by_ids(db, group_ids)
+        payload["groups"] = [dict(group._mapping) for group in groups]
+        payload["deleted_groups"] = sorted(set(group_ids) - {group.id for group in groups})
+    if student_ids:
+        students = await student_crud.list_students_by_ids(db, student_ids)
+        for student in students:
+            item = student_payload(student)
+            item["group_name"] = student.group_name
+            payload["students"].append(item)
+        payload["deleted_students"] = sorted(set(student_ids) - {student.id for student in students})
+    return payload
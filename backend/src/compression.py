@@ -0,0 +1,195 @@
+"""
+Сжатие ответов (zstd, brotli, gzip) с выбором по Accept-Encoding.
+
+ASGI-middleware сжимает тело по мере отправки, поэтому работает и с потоковыми ответами
+(выгрузка студентов): каждый чанк сжимается и сразу отправляется клиенту.
+brotli и zstandard — необязательные зависимости: без них соответствующая кодировка не предлагается.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript")
+# Server-Sent Events нельзя буферизовать в компрессоре
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        result = self._compressor.compress(data)
+        return result + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else result
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        result = self._compressor.process(data)
+        return result + self._compressor.flush() if flush else result
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        result = self._compressor.compress(data)
+        return result + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else result
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+def available_encodings() -> list[str]:
+    """Поддерживаемые кодировки в порядке предпочтения сервера"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def select_encoding(accept_encoding: str, encodings: list[str]) -> str | None:
+    """Выбирает кодировку по Accept-Encoding: наибольший q, при равенстве — порядок encodings"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in encodings:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+        self.compressor_factories = {
+            "gzip": lambda: _GzipCompressor(gzip_level),
+            "br": lambda: _BrotliCompressor(brotli_quality),
+            "zstd": lambda: _ZstdCompressor(zstd_level),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        compressor_factory = self.compressor_factories[encoding] if encoding is not None else None
+        responder = _CompressionResponder(send, encoding, compressor_factory, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """
+    Перехватывает ответ: решает по первому чанку тела, сжимать ли его.
+    Vary: Accept-Encoding получает любой ответ подходящего типа, в том числе несжатый
+    (маленький или без подходящей кодировки у клиента): иначе общий кэш отдаст его
+    клиентам с другим Accept-Encoding.
+    """
+
+    def __init__(self, send: Send, encoding: str | None, compressor_factory, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.compressor_factory = compressor_factory
+        self.minimum_size = minimum_size
+        self.start_message: Message | None = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = MutableHeaders(raw=message["headers"])
+            compressible = _is_compressible(headers)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            self.passthrough = not compressible or self.encoding is None
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            self.compressor = self.compressor_factory()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if "content-length" in headers:
+                del headers["content-length"]
+            # Сжатое представление не совпадает побайтно с исходным
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await self._send(self.start_message)
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+        else:
+            chunk = self.compressor.compress(body, flush=False) + self.compressor.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -9,12 +9,66 @@ class Settings(BaseSettings):
     
     # Database URL
     DATABASE_URL: str
+
+    # Database pool settings (на каждый воркер uvicorn)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30.0
     
     # JWT settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    # Потоки для bcrypt (хеширование и проверка паролей) на каждый воркер
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Кэш проверенных токенов в get_current_user (на каждый воркер)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Кэш готовых ответов (списки и карточки групп, счетчики /users/me) на каждый воркер, 0 — выключен
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
     
+    # Pagination settings
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+
+    # Search settings (pg_trgm)
+    SEARCH_LIMIT_DEFAULT: int = 10
+    SEARCH_LIMIT_MAX: int = 50
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.3
+
+    # Roster import settings
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # Export settings
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Response compression settings
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Server-Sent Events settings
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_QUEUE_SIZE: int = 100
+    SSE_RETRY_MS: int = 3000
+
+    # Prometheus metrics settings
+    METRICS_ENABLED: bool = True
+    METRICS_SAMPLE_SECONDS: float = 5.0
+
+    # Учет запросов: заголовок Server-Timing, строка в debug-логе и поиск N+1
+    REQUEST_STATS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    # Один и тот же SQL больше стольких раз за HTTP-запрос — предупреждение о N+1, 0 — не искать
+    N_PLUS_ONE_THRESHOLD: int = 10
+
     # Application settings
     DEBUG: bool = False
     
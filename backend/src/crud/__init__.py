@@ -1,5 +1,5 @@
-from src.crud import group, student, user
+from src.crud import counters, group, student, user
 
-__all__ = ["group", "student", "user"]
+__all__ = ["counters", "group", "student", "user"]
 
 
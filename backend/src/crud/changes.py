@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Sequence
+
+from sqlalchemy import ARRAY, Integer, Row, String, bindparam, cast, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud import counters
+from src.models.change import Change
+from src.models.group import Student
+
+GROUP = "group"
+STUDENT = "student"
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Последний удаленный из журнала seq: клиенту с since меньше него нужна полная загрузка
+PRUNED_SEQ = "changes_pruned_seq"
+
+# Ключ advisory-блокировки журнала. Блокировка берется до выдачи seq и держится до коммита,
+# поэтому транзакции фиксируются в порядке seq и читатель не пропустит "запоздавший" seq.
+CHANGES_LOCK_ID = 0x63686731
+
+# Канал NOTIFY: payload — последний seq транзакции, доставляется слушателям при коммите
+CHANGES_CHANNEL = "changes"
+
+
+async def _lock_changes(db: AsyncSession) -> None:
+    await db.execute(select(func.pg_advisory_xact_lock(CHANGES_LOCK_ID)))
+
+
+async def _notify(db: AsyncSession) -> None:
+    last_seq = select(func.max(Change.seq)).scalar_subquery()
+    await db.execute(select(func.pg_notify(CHANGES_CHANNEL, cast(last_seq, String))))
+
+
+async def _insert_changes(db: AsyncSession, entity: str, ids: Iterable[int], op: str) -> None:
+    ids = sorted(set(ids))
+    if not ids:
+        return
+    entity_ids = func.unnest(bindparam("entity_ids", ids, type_=ARRAY(Integer)))
+    await db.execute(
+        insert(Change).from_select(
+            ["entity", "entity_id", "op"],
+            select(literal(entity), entity_ids, literal(op)),
+        )
+    )
+
+
+async def record_changes(
+    db: AsyncSession,
+    groups: Iterable[int] = (),
+    students: Iterable[int] = (),
+    deleted_groups: Iterable[int] = (),
+    deleted_students: Iterable[int] = (),
+) -> None:
+    """
+    Записывает изменения в журнал; вызывать последним шагом перед коммитом.
+    Блокировка журнала общая для всех писателей: после нее транзакция не должна ждать
+    других блокировок (порядок — в src/crud/counters.py).
+    """
+    await _lock_changes(db)
+    await _insert_changes(db, GROUP, groups, UPSERT)
+    await _insert_changes(db, STUDENT, students, UPSERT)
+    await _insert_changes(db, GROUP, deleted_groups, DELETE)
+    await _insert_changes(db, STUDENT, deleted_students, DELETE)
+    await _notify(db)
+
+
+async def record_group_rename(db: AsyncSession, group_id: int) -> None:
+    """Переименование группы: отмечаются и все ее студенты (в их записях журнала есть group_name)."""
+    await _lock_changes(db)
+    await db.execute(
+        insert(Change).from_select(
+            ["entity", "entity_id", "op"],
+            select(literal(STUDENT), Student.id, literal(UPSERT)).where(Student.group_id == group_id),
+        )
+    )
+    await _insert_changes(db, GROUP, [group_id], UPSERT)
+    await _notify(db)
+
+
+async def record_group_delete(db: AsyncSession, group_id: int) -> None:
+    """Удаление группы: удаляются и все ее студенты (ON DELETE CASCADE)."""
+    await _lock_changes(db)
+    await db.execute(
+        insert(Change).from_select(
+            ["entity", "entity_id", "op"],
+            select(literal(STUDENT), Student.id, literal(DELETE)).where(Student.group_id == group_id),
+        )
+    )
+    await _insert_changes(db, GROUP, [group_id], DELETE)
+    await _notify(db)
+
+
+async def get_last_seq(db: AsyncSession) -> int:
+    result = await db.execute(select(func.coalesce(func.max(Change.seq), 0)))
+    return result.scalar_one()
+
+
+async def get_pruned_seq(db: AsyncSession) -> int:
+    return (await counters.get_counters(db, PRUNED_SEQ))[PRUNED_SEQ]
+
+
+async def list_changed_entities(db: AsyncSession, since: int, limit: int) -> Sequence[Row]:
+    """
+    Сущности, измененные после since, по одной строке на сущность с ее последним seq,
+    в порядке этого seq.
+    """
+    last_seq = func.max(Change.seq)
+    result = await db.execute(
+        select(Change.entity, Change.entity_id, last_seq.label("seq"))
+        .where(Change.seq > since)
+        .group_by(Change.entity, Change.entity_id)
+        .order_by(last_seq)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def prune_changes(db: AsyncSession, keep_days: int) -> int:
+    """Удаляет записи журнала старше keep_days дней и запоминает последний удаленный seq."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days)
+    result = await db.execute(select(func.max(Change.seq)).where(Change.created_at < cutoff))
+    pruned_seq = result.scalar_one()
+    if pruned_seq is None:
+        return 0
+    pruned = await db.execute(delete(Change).where(Change.seq <= pruned_seq))
+    await counters.set_counter(db, PRUNED_SEQ, max(pruned_seq, await get_pruned_seq(db)))
+    await db.commit()
+    return pruned.rowcount
@@ -0,0 +1,192 @@
+"""
+Счетчики групп и таблицы counters.
+
+Порядок блокировок во всех путях записи (иначе встречные транзакции могут взаимно
+заблокироваться): строки студентов, строки групп по возрастанию id, счетчики GROUPS/STUDENTS,
+затем data_version (bump_versions), и последней — advisory-блокировка журнала изменений
+(src/crud/changes.py), которая держится до коммита и сериализует всех писателей.
+"""
+from sqlalchemy import String, case, cast, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.counter import Counter
+from src.models.group import Group, Student
+
+STUDENTS = "students"
+GROUPS = "groups"
+# Версия данных групп и студентов целиком (ETag списков)
+DATA_VERSION = "data_version"
+# Канал NOTIFY с новой версией данных: другие воркеры сбрасывают кэш ответов (src/data_version.py)
+DATA_VERSION_CHANNEL = "data_version"
+# Ключ session.info: версия, которую транзакция запишет при коммите
+PENDING_DATA_VERSION = "pending_data_version"
+
+
+async def get_counters(db: AsyncSession, *names: str) -> dict[str, int]:
+    result = await db.execute(select(Counter.name, Counter.value).where(Counter.name.in_(names)))
+    values = dict(result.all())
+    return {name: values.get(name, 0) for name in names}
+
+
+async def add_to_counter(db: AsyncSession, name: str, delta: int) -> None:
+    if not delta:
+        return
+    stmt = insert(Counter).values(name=name, value=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Counter.name], set_={"value": Counter.value + stmt.excluded.value}
+    )
+    await db.execute(stmt)
+
+
+async def set_counter(db: AsyncSession, name: str, value: int) -> None:
+    stmt = insert(Counter).values(name=name, value=value)
+    stmt = stmt.on_conflict_do_update(index_elements=[Counter.name], set_={"value": stmt.excluded.value})
+    await db.execute(stmt)
+
+
+async def _shift_group(db: AsyncSession, group_id: int, sign: int, total_score: int) -> None:
+    """Добавляет (sign=1) или убирает (sign=-1) студента из счетчиков группы."""
+    await db.execute(
+        update(Group)
+        .where(Group.id == group_id)
+        .values(
+            students_quantity=Group.students_quantity + sign,
+            excluded_students_quantity=Group.excluded_students_quantity
+            + case((Group.control_sum > total_score, sign), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def track_student_insert(db: AsyncSession, group_id: int, total_score: int) -> None:
+    await _shift_group(db, group_id, 1, total_score)
+    await add_to_counter(db, STUDENTS, 1)
+
+
+async def track_student_delete(db: AsyncSession, group_id: int, total_score: int) -> None:
+    await _shift_group(db, group_id, -1, total_score)
+    await add_to_counter(db, STUDENTS, -1)
+
+
+async def track_student_update(
+    db: AsyncSession, old_group_id: int, old_total_score: int, new_group_id: int, new_total_score: int
+) -> None:
+    if (old_group_id, old_total_score) == (new_group_id, new_total_score):
+        return
+    shifts = [(old_group_id, -1, old_total_score), (new_group_id, 1, new_total_score)]
+    # Строки групп блокируются по возрастанию id: встречные переводы (A→B и B→A) не дают взаимоблокировку
+    for group_id, sign, total_score in sorted(shifts, key=lambda shift: shift[0]):
+        await _shift_group(db, group_id, sign, total_score)
+
+
+async def track_group_insert(db: AsyncSession, students_quantity: int = 0) -> None:
+    await add_to_counter(db, GROUPS, 1)
+    await add_to_counter(db, STUDENTS, students_quantity)
+
+
+async def track_group_delete(db: AsyncSession, students_quantity: int) -> None:
+    await add_to_counter(db, GROUPS, -1)
+    await add_to_counter(db, STUDENTS, -students_quantity)
+
+
+async def bump_versions(db: AsyncSession, *group_ids: int) -> None:
+    """
+    Отмечает изменение данных: общая версия и версии перечисленных групп увеличиваются на 1.
+    Новая общая версия рассылается через NOTIFY при коммите.
+    """
+    stmt = insert(Counter).values(name=DATA_VERSION, value=1)
+    bumped = stmt.on_conflict_do_update(
+        index_elements=[Counter.name], set_={"value": Counter.value + stmt.excluded.value}
+    ).returning(Counter.value).cte("bumped")
+    result = await db.execute(
+        select(bumped.c.value, func.pg_notify(DATA_VERSION_CHANNEL, cast(bumped.c.value, String)))
+    )
+    db.info[PENDING_DATA_VERSION] = result.first()[0]
+    if group_ids:
+        await db.execute(
+            update(Group)
+            .where(Group.id.in_(set(group_ids)))
+            .values(version=Group.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _actual_group_counts():
+    """Подзапросы с фактическим количеством студентов и недопущенных для каждой группы."""
+    students_quantity = (
+        select(func.count(Student.id)).where(Student.group_id == Group.id).scalar_subquery()
+    )
+    excluded_students_quantity = (
+        select(func.count(Student.id))
+        .where(Student.group_id == Group.id, Student.total_score < Group.control_sum)
+        .scalar_subquery()
+    )
+    return students_quantity, excluded_students_quantity
+
+
+async def recompute_group_counters(db: AsyncSession, group_ids: list[int] | None = None) -> None:
+    """Полностью пересчитывает счетчики групп (например, после изменения control_sum)."""
+    students_quantity, excluded_students_quantity = _actual_group_counts()
+    stmt = (
+        update(Group)
+        .values(
+            students_quantity=students_quantity,
+            excluded_students_quantity=excluded_students_quantity,
+            version=Group.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if group_ids is not None:
+        stmt = stmt.where(Group.id.in_(group_ids))
+    await db.execute(stmt)
+
+
+async def verify_counters(db: AsyncSession) -> dict:
+    """Сравнивает счетчики с фактическими данными и возвращает расхождения."""
+    students_quantity, excluded_students_quantity = _actual_group_counts()
+    actual_students_quantity = students_quantity.label("actual_students_quantity")
+    actual_excluded_quantity = excluded_students_quantity.label("actual_excluded_students_quantity")
+    result = await db.execute(
+        select(
+            Group.id,
+            Group.students_quantity,
+            actual_students_quantity,
+            Group.excluded_students_quantity,
+            actual_excluded_quantity,
+        ).where(
+            (Group.students_quantity != students_quantity)
+            | (Group.excluded_students_quantity != excluded_students_quantity)
+        )
+    )
+    groups_drift = [row._asdict() for row in result.all()]
+
+    stored = await get_counters(db, STUDENTS, GROUPS)
+    actual = {
+        STUDENTS: (await db.execute(select(func.count(Student.id)))).scalar_one(),
+        GROUPS: (await db.execute(select(func.count(Group.id)))).scalar_one(),
+    }
+    counters_drift = {
+        name: {"stored": stored[name], "actual": actual[name]}
+        for name in (STUDENTS, GROUPS)
+        if stored[name] != actual[name]
+    }
+    return {"groups": groups_drift, "counters": counters_drift}
+
+
+async def repair_counters(db: AsyncSession) -> dict:
+    """Исправляет расхождения счетчиков. Возвращает найденные до исправления расхождения."""
+    drift = await verify_counters(db)
+    await recompute_group_counters(db)
+    await set_counter(db, STUDENTS, (await db.execute(select(func.count(Student.id)))).scalar_one())
+    await set_counter(db, GROUPS, (await db.execute(select(func.count(Group.id)))).scalar_one())
+    await bump_versions(db)
+    await db.commit()
+    return drift
+
+
+async def ensure_counters(db: AsyncSession) -> None:
+    """Инициализирует счетчики при первом запуске на существующей базе."""
+    result = await db.execute(select(Counter.name).where(Counter.name == STUDENTS))
+    if result.scalar_one_or_none() is None:
+        await repair_counters(db)
@@ -1,8 +1,13 @@
-from sqlalchemy import func, select
+from typing import Sequence
+
+from sqlalchemy import Row, func, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.crud import changes, counters
+from src.crud import student as student_crud
 from src.models.group import Group
+from src.utils import student_total_score
 
 
 async def get_group_by_id(db: AsyncSession, group_id: int, with_students: bool = False) -> Group | None:
@@ -18,34 +23,108 @@ async def get_group_by_name(db: AsyncSession, name: str) -> Group | None:
     return result.scalar_one_or_none()
 
 
-async def list_groups(db: AsyncSession) -> list[Group]:
+async def list_groups(
+    db: AsyncSession,
+    after: tuple[str, int] | None = None,
+    limit: int | None = None,
+) -> Sequence[Row]:
+    """Строки групп (только поля ответа списка) в порядке (name, id)."""
+    stmt = select(
+        Group.id,
+        Group.name,
+        Group.control_sum,
+        Group.students_quantity,
+        Group.excluded_students_quantity,
+    ).order_by(Group.name, Group.id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Group.name, Group.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def list_groups_by_ids(db: AsyncSession, group_ids: list[int]) -> Sequence[Row]:
     result = await db.execute(
-        select(Group).options(selectinload(Group.students)).order_by(Group.name)
+        select(
+            Group.id,
+            Group.name,
+            Group.control_sum,
+            Group.students_quantity,
+            Group.excluded_students_quantity,
+        ).where(Group.id.in_(group_ids))
     )
-    return result.scalars().unique().all()
+    return result.all()
 
 
-async def create_group(db: AsyncSession, name: str, control_sum: int) -> Group:
-    group = Group(name=name, control_sum=control_sum)
+async def search_groups(db: AsyncSession, query: str, limit: int) -> list:
+    """Нечеткий поиск по названию группы (pg_trgm word similarity), самые похожие первыми."""
+    rank = func.word_similarity(query, Group.name)
+    result = await db.execute(
+        select(Group.id, Group.name, rank.label("rank"))
+        .where(literal(query).op("<%")(Group.name))
+        .order_by(rank.desc(), Group.name)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def create_group(
+    db: AsyncSession, name: str, control_sum: int, students: list[dict] | None = None
+) -> Group:
+    students = students or []
+    group = Group(
+        name=name,
+        control_sum=control_sum,
+        students_quantity=len(students),
+        excluded_students_quantity=sum(
+            1
+            for student in students
+            if control_sum > student_total_score(student.get("score_1"), student.get("score_2"), student.get("score_3"))
+        ),
+    )
     db.add(group)
+    await db.flush()
+    student_ids = await student_crud.bulk_create_students(db, group.id, students) if students else []
+    await counters.track_group_insert(db, students_quantity=len(students))
+    await counters.bump_versions(db)
+    await changes.record_changes(db, groups=[group.id], students=student_ids)
     await db.commit()
     await db.refresh(group)
     return group
 
 
 async def update_group(db: AsyncSession, group: Group, update_data: dict) -> Group:
+    control_sum_changed = "control_sum" in update_data and update_data["control_sum"] != group.control_sum
+    name_changed = "name" in update_data and update_data["name"] != group.name
     for field, value in update_data.items():
         setattr(group, field, value)
+    if control_sum_changed:
+        await db.flush()
+        await counters.recompute_group_counters(db, [group.id])
+    await counters.bump_versions(db, group.id)
+    if name_changed:
+        await changes.record_group_rename(db, group.id)
+    else:
+        await changes.record_changes(db, groups=[group.id])
     await db.commit()
     await db.refresh(group)
     return group
 
 
 async def delete_group(db: AsyncSession, group: Group) -> None:
+    await counters.track_group_delete(db, group.students_quantity)
+    await counters.bump_versions(db)
+    await changes.record_group_delete(db, group.id)
     await db.delete(group)
     await db.commit()
 
 
+async def get_group_version(db: AsyncSession, group_id: int) -> int | None:
+    result = await db.execute(select(Group.version).where(Group.id == group_id))
+    return result.scalar_one_or_none()
+
+
 async def count_groups(db: AsyncSession) -> int:
     result = await db.execute(select(func.count(Group.id)))
     return result.scalar_one()
@@ -1,23 +1,174 @@
-from sqlalchemy import func, select
+from itertools import chain
+from typing import AsyncIterable, AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    Row,
+    String,
+    Table,
+    case,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.models.group import Student
+from src.crud import changes, counters
+from src.models.group import Group, Student
+from src.utils import student_total_score
+
+# Строк в одном INSERT (ограничение asyncpg — 32767 параметров на запрос)
+BULK_INSERT_BATCH_SIZE = 1000
+
+SCORE_FIELDS = ("score_1", "score_2", "score_3")
+
+# Временная таблица для импорта ведомостей через COPY (не входит в Base.metadata)
+students_import = Table(
+    "students_import",
+    MetaData(),
+    Column("row_no", Integer, nullable=False),
+    Column("group_name", String(150), nullable=False),
+    Column("fio", String(255), nullable=False),
+    Column("score_1", String(1)),
+    Column("score_2", String(1)),
+    Column("score_3", String(1)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+# Колонки студента для списков и выгрузки: читаются как строки (Row), без ORM-объектов
+STUDENT_COLUMNS = (
+    Student.id,
+    Student.fio,
+    Student.score_1,
+    Student.score_2,
+    Student.score_3,
+    Student.total_score,
+    Student.group_id,
+)
+
 
+def _like_pattern(value: str) -> str:
+    """Шаблон ILIKE для поиска подстроки с экранированием спецсимволов."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
-async def get_student_by_id(db: AsyncSession, student_id: int, with_group: bool = False) -> Student | None:
+
+async def get_student_by_id(
+    db: AsyncSession, student_id: int, with_group: bool = False, for_update: bool = False
+) -> Student | None:
     stmt = select(Student).where(Student.id == student_id)
     if with_group:
         stmt = stmt.options(selectinload(Student.group))
+    if for_update:
+        stmt = stmt.with_for_update()
     result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
 
-async def list_students(db: AsyncSession) -> list[Student]:
+async def list_group_students(db: AsyncSession, group_id: int) -> Sequence[Row]:
+    result = await db.execute(
+        select(*STUDENT_COLUMNS).where(Student.group_id == group_id).order_by(Student.fio, Student.id)
+    )
+    return result.all()
+
+
+def _filter_students(stmt, group_id: int | None, search: str | None, status: str | None):
+    """Фильтры списка студентов; запрос уже должен содержать JOIN с groups."""
+    if group_id is not None:
+        stmt = stmt.where(Student.group_id == group_id)
+    if search:
+        stmt = stmt.where(Student.fio.ilike(_like_pattern(search), escape="\\"))
+    if status == "allowed":
+        stmt = stmt.where(Student.total_score >= Group.control_sum)
+    elif status == "notAllowed":
+        stmt = stmt.where(Student.total_score < Group.control_sum)
+    return stmt
+
+
+async def list_students(
+    db: AsyncSession,
+    after: tuple[str, int] | None = None,
+    limit: int | None = None,
+    group_id: int | None = None,
+    search: str | None = None,
+    status: str | None = None,
+) -> Sequence[Row]:
+    """Строки студентов с group_name (JOIN groups) в порядке (fio, id)."""
+    stmt = (
+        select(*STUDENT_COLUMNS, Group.name.label("group_name"))
+        .join(Group, Group.id == Student.group_id)
+        .order_by(Student.fio, Student.id)
+    )
+    stmt = _filter_students(stmt, group_id, search, status)
+    if after is not None:
+        stmt = stmt.where(tuple_(Student.fio, Student.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def list_students_by_ids(db: AsyncSession, student_ids: list[int]) -> Sequence[Row]:
+    result = await db.execute(
+        select(*STUDENT_COLUMNS, Group.name.label("group_name"))
+        .join(Group, Group.id == Student.group_id)
+        .where(Student.id.in_(student_ids))
+    )
+    return result.all()
+
+
+async def stream_students_export(
+    db: AsyncSession,
+    batch_size: int,
+    group_id: int | None = None,
+    search: str | None = None,
+    status: str | None = None,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Отдает строки выгрузки пачками по batch_size через серверный курсор.
+    Порядок (fio, id) совпадает с индексом, поэтому первые строки приходят сразу.
+    """
+    stmt = (
+        select(*STUDENT_COLUMNS, Group.name.label("group_name"))
+        .join(Group, Group.id == Student.group_id)
+        .order_by(Student.fio, Student.id)
+        .execution_options(yield_per=batch_size)
+    )
+    stmt = _filter_students(stmt, group_id, search, status)
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        yield rows
+
+
+async def search_students(db: AsyncSession, query: str, limit: int) -> list:
+    """Нечеткий поиск по ФИО (pg_trgm word similarity), самые похожие первыми."""
+    rank = func.word_similarity(query, Student.fio)
     result = await db.execute(
-        select(Student).options(selectinload(Student.group)).order_by(Student.fio)
+        select(
+            Student.id,
+            Student.fio,
+            Student.group_id,
+            Group.name.label("group_name"),
+            rank.label("rank"),
+        )
+        .join(Group, Group.id == Student.group_id)
+        .where(literal(query).op("<%")(Student.fio))
+        .order_by(rank.desc(), Student.fio, Student.id)
+        .limit(limit)
     )
-    return result.scalars().all()
+    return result.all()
 
 
 async def create_student(
@@ -36,20 +187,219 @@ async def create_student(
         score_3=score_3,
     )
     db.add(student)
+    await counters.track_student_insert(db, group_id, student_total_score(score_1, score_2, score_3))
+    await counters.bump_versions(db, group_id)
+    await db.flush()
+    await changes.record_changes(db, groups=[group_id], students=[student.id])
     await db.commit()
     await db.refresh(student)
     return student
 
 
+async def bulk_create_students(db: AsyncSession, group_id: int, students: list[dict]) -> list[int]:
+    """
+    Добавляет студентов группы многострочным INSERT ... RETURNING без коммита.
+    Счетчики обновляет вызывающий код.
+    """
+    student_ids = []
+    for start in range(0, len(students), BULK_INSERT_BATCH_SIZE):
+        rows = [
+            {
+                "fio": student["fio"],
+                "group_id": group_id,
+                "score_1": student.get("score_1"),
+                "score_2": student.get("score_2"),
+                "score_3": student.get("score_3"),
+            }
+            for student in students[start:start + BULK_INSERT_BATCH_SIZE]
+        ]
+        result = await db.execute(insert(Student).values(rows).returning(Student.id))
+        student_ids.extend(result.scalars().all())
+    return student_ids
+
+
+async def import_students(db: AsyncSession, batches: AsyncIterable[list[tuple]]) -> dict:
+    """
+    Импортирует ведомость: пачки записей (row_no, group_name, fio, score_1, score_2, score_3)
+    загружаются через COPY во временную таблицу, затем группы сопоставляются одним JOIN.
+    Существующим студентам группы с тем же ФИО обновляются непустые оценки, остальные добавляются.
+    При повторе (группа, ФИО) в файле используется последняя строка, прежние возвращаются
+    в duplicate_rows.
+    """
+    connection = await db.connection()
+    await connection.run_sync(students_import.create)
+    raw_connection = await connection.get_raw_connection()
+    columns = list(students_import.c.keys())
+
+    async for batch in batches:
+        await raw_connection.driver_connection.copy_records_to_table(
+            students_import.name, records=batch, columns=columns
+        )
+
+    unknown_groups = await db.execute(
+        select(students_import.c.row_no, students_import.c.group_name)
+        .outerjoin(Group, Group.name == students_import.c.group_name)
+        .where(Group.id.is_(None))
+        .order_by(students_import.c.row_no)
+    )
+    unknown_group_rows = unknown_groups.all()
+
+    last_row_no = (
+        func.max(students_import.c.row_no)
+        .over(partition_by=(students_import.c.group_name, students_import.c.fio))
+        .label("last_row_no")
+    )
+    occurrences = (
+        select(students_import.c.row_no, students_import.c.group_name, students_import.c.fio, last_row_no)
+        .join(Group, Group.name == students_import.c.group_name)
+        .subquery()
+    )
+    duplicates = await db.execute(
+        select(occurrences.c.row_no, occurrences.c.fio, occurrences.c.last_row_no)
+        .where(occurrences.c.row_no < occurrences.c.last_row_no)
+        .order_by(occurrences.c.row_no)
+    )
+    duplicate_rows = duplicates.all()
+
+    latest = (
+        select(students_import)
+        .distinct(students_import.c.group_name, students_import.c.fio)
+        .order_by(students_import.c.group_name, students_import.c.fio, students_import.c.row_no.desc())
+        .subquery()
+    )
+    resolved = (
+        select(
+            latest.c.fio,
+            Group.id.label("group_id"),
+            latest.c.score_1,
+            latest.c.score_2,
+            latest.c.score_3,
+        )
+        .join(Group, Group.name == latest.c.group_name)
+        .subquery()
+    )
+    updated = await db.execute(
+        update(Student)
+        .where(Student.group_id == resolved.c.group_id, Student.fio == resolved.c.fio)
+        .values(
+            score_1=func.coalesce(resolved.c.score_1, Student.score_1),
+            score_2=func.coalesce(resolved.c.score_2, Student.score_2),
+            score_3=func.coalesce(resolved.c.score_3, Student.score_3),
+        )
+        .returning(Student.id, Student.group_id)
+        .execution_options(synchronize_session=False)
+    )
+    updated_rows = updated.all()
+    inserted = await db.execute(
+        insert(Student)
+        .from_select(
+            ["fio", "group_id", "score_1", "score_2", "score_3"],
+            select(
+                resolved.c.fio,
+                resolved.c.group_id,
+                resolved.c.score_1,
+                resolved.c.score_2,
+                resolved.c.score_3,
+            ).where(
+                ~exists().where(Student.group_id == resolved.c.group_id, Student.fio == resolved.c.fio)
+            ),
+        )
+        .returning(Student.id, Student.group_id)
+    )
+    inserted_rows = inserted.all()
+
+    affected_group_ids = {row.group_id for row in updated_rows} | {row.group_id for row in inserted_rows}
+    if affected_group_ids:
+        await counters.recompute_group_counters(db, sorted(affected_group_ids))
+        await counters.add_to_counter(db, counters.STUDENTS, len(inserted_rows))
+        await counters.bump_versions(db, *affected_group_ids)
+        await changes.record_changes(
+            db,
+            groups=affected_group_ids,
+            students=[row.id for row in updated_rows] + [row.id for row in inserted_rows],
+        )
+    await db.commit()
+    return {
+        "inserted": len(inserted_rows),
+        "updated": len(updated_rows),
+        "unknown_group_rows": unknown_group_rows,
+        "duplicate_rows": duplicate_rows,
+    }
+
+
 async def update_student(db: AsyncSession, student: Student, update_data: dict) -> Student:
+    old_group_id, old_total_score = student.group_id, student.total_score
     for field, value in update_data.items():
         setattr(student, field, value)
+    await db.flush()
+    await counters.track_student_update(
+        db,
+        old_group_id,
+        old_total_score,
+        student.group_id,
+        student_total_score(student.score_1, student.score_2, student.score_3),
+    )
+    await counters.bump_versions(db, old_group_id, student.group_id)
+    await changes.record_changes(db, groups={old_group_id, student.group_id}, students=[student.id])
     await db.commit()
     await db.refresh(student)
     return student
 
 
+async def lock_group_students(db: AsyncSession, group_id: int, student_ids: Iterable[int]) -> set[int]:
+    """Блокирует (FOR UPDATE) перечисленных студентов группы и возвращает найденные id."""
+    result = await db.execute(
+        select(Student.id)
+        .where(Student.group_id == group_id, Student.id.in_(list(student_ids)))
+        .with_for_update()
+    )
+    return set(result.scalars().all())
+
+
+async def update_group_scores(db: AsyncSession, group_id: int, edits: dict[int, dict[str, str | None]]) -> int:
+    """
+    Применяет правки оценок {student_id: {поле: значение}} одним UPDATE ... FROM (VALUES ...)
+    и пересчитывает счетчики группы. Для каждого поля в VALUES передается флаг set_<поле>,
+    чтобы отличать "не менять" от "очистить оценку".
+    """
+    fields = [field for field in SCORE_FIELDS if any(field in edit for edit in edits.values())]
+    score_edits = values(
+        column("id", Integer),
+        *chain.from_iterable((column(f"set_{field}", Boolean), column(field, String(1))) for field in fields),
+        name="score_edits",
+    ).data(
+        [
+            (student_id, *chain.from_iterable((field in edit, edit.get(field)) for field in fields))
+            for student_id, edit in edits.items()
+        ]
+    )
+    result = await db.execute(
+        update(Student)
+        .where(Student.id == score_edits.c.id, Student.group_id == group_id)
+        .values(
+            {
+                getattr(Student, field): case(
+                    (score_edits.c[f"set_{field}"], score_edits.c[field]),
+                    else_=getattr(Student, field),
+                )
+                for field in fields
+            }
+        )
+        .returning(Student.id)
+        .execution_options(synchronize_session=False)
+    )
+    student_ids = result.scalars().all()
+    await counters.recompute_group_counters(db, [group_id])
+    await counters.bump_versions(db, group_id)
+    await changes.record_changes(db, groups=[group_id], students=student_ids)
+    await db.commit()
+    return len(student_ids)
+
+
 async def delete_student(db: AsyncSession, student: Student) -> None:
+    await counters.track_student_delete(db, student.group_id, student.total_score)
+    await counters.bump_versions(db, student.group_id)
+    await changes.record_changes(db, groups=[student.group_id], deleted_students=[student.id])
     await db.delete(student)
     await db.commit()
 
@@ -1,8 +1,18 @@
-from sqlalchemy import select
+import json
+
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.cache import invalidate_user_principals
 from src.models.user import User
 from src.schemas.user import UserCreate
-from src.utils import get_password_hash
+from src.utils import password_hasher
+
+# Канал NOTIFY с логинами, чьи проверенные токены сбрасываются во всех воркерах (src/cache.py)
+PRINCIPALS_CHANNEL = "principals"
+
+async def notify_principals_changed(db: AsyncSession, *logins: str) -> None:
+    """NOTIFY уходит при коммите транзакции, поэтому другие воркеры не увидят старые данные после сброса"""
+    await db.execute(select(func.pg_notify(PRINCIPALS_CHANNEL, json.dumps(sorted(set(logins)), ensure_ascii=False))))
 
 async def get_user_by_login(db: AsyncSession, login: str) -> User:
     result = await db.execute(select(User).where(User.login == login))
@@ -12,12 +22,17 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
     result = await db.execute(select(User).where(User.id == user_id))
     return result.scalar_one_or_none()
 
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[User]:
-    result = await db.execute(select(User).offset(skip).limit(limit))
+async def get_users(db: AsyncSession, after_id: int | None = None, limit: int | None = 100) -> list[User]:
+    stmt = select(User).order_by(User.id)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
     return result.scalars().all()
 
 async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
-    hashed_password = get_password_hash(user_create.password)
+    hashed_password = await password_hasher.hash(user_create.password)
     db_user = User(
         login=user_create.login,
         password_hash=hashed_password,
@@ -33,10 +48,14 @@ async def update_user(db: AsyncSession, user_id: int, update_data: dict) -> User
     if not user:
         return None
     
+    old_login = user.login
     for field, value in update_data.items():
         if hasattr(user, field):
             setattr(user, field, value)
     
+    await notify_principals_changed(db, old_login, user.login)
     await db.commit()
     await db.refresh(user)
+    # Свой воркер сбрасывает кэш сразу, не дожидаясь уведомления
+    invalidate_user_principals(old_login, user.login)
     return user
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Версия данных групп и студентов (счетчик data_version) для ETag и кэша ответов.
+
+Каждая запись в src/crud увеличивает версию через counters.bump_versions. Версия читается
+из БД на каждый запрос (поиск по первичному ключу counters), поэтому после коммита в любом
+воркере следующий запрос в любой другой уже видит новую версию. Кэш ответов экономит только
+сборку и сериализацию тела.
+
+Уведомления NOTIFY с новой версией (слушатель в src/events.py) и коммиты своего воркера
+лишь заранее освобождают память кэша от устаревших ответов; на корректность они не влияют.
+"""
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.cache import response_cache
+from src.crud import counters
+
+
+class DataVersionTracker:
+    def __init__(self):
+        self.notifications = 0
+
+    def observe(self, version: int) -> None:
+        response_cache.invalidate(version)
+
+    def on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            version = int(payload)
+        except ValueError:
+            return
+        self.notifications += 1
+        self.observe(version)
+
+
+data_version = DataVersionTracker()
+
+
+async def get_data_version(db: AsyncSession) -> int:
+    version = (await counters.get_counters(db, counters.DATA_VERSION))[counters.DATA_VERSION]
+    data_version.observe(version)
+    return version
+
+
+@event.listens_for(Session, "after_commit")
+def _observe_committed_version(session: Session) -> None:
+    version = session.info.pop(counters.PENDING_DATA_VERSION, None)
+    if version is not None:
+        data_version.observe(version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_version(session: Session) -> None:
+    session.info.pop(counters.PENDING_DATA_VERSION, None)
@@ -1,21 +1,89 @@
-from sqlalchemy import text
+import os
+import time
+
+from sqlalchemy import exc, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateColumn
 
 from src.config import settings
 from src.models.base import Base
+from src.models.change import Change
+from src.models.counter import Counter
 from src.models.group import Group, Student
 from src.models.user import User
 
 # Асинхронный URL для подключения к PostgreSQL
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# Создаем асинхронный engine
+
+
+class PoolStats:
+    """Статистика пула соединений текущего воркера"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_checkout(self, wait_time: float, overflow: bool) -> None:
+        self.checkouts += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        if overflow:
+            self.overflow_events += 1
+
+    def snapshot(self, pool: AsyncAdaptedQueuePool) -> dict:
+        return {
+            "pid": os.getpid(),
+            "size": pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "wait_time_total": round(self.wait_time_total, 6),
+            "wait_time_avg": round(self.wait_time_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "wait_time_max": round(self.wait_time_max, 6),
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, который учитывает время ожидания и выход за pool_size"""
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        pool_stats.record_checkout(
+            time.perf_counter() - started,
+            overflow=self._overflow > overflow_before and self.overflow() > 0,
+        )
+        return connection
+
+
+# Создаем асинхронный engine с пулом соединений (настройки пула — в Settings)
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     echo=False,  # Логирование SQL запросов (отключите в production)
-    poolclass=NullPool,  # Для избежания проблем с пулом соединений
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     future=True,  # Для поддержки SQLAlchemy 2.0
 )
 
@@ -52,7 +120,35 @@ async def create_tables():
     Вызывается при старте приложения.
     """
     async with engine.begin() as conn:
+        # Триграммные индексы для поиска по ФИО и названию группы
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+
+def _add_missing_columns(connection):
+    """
+    Добавляет колонки, появившиеся в моделях после создания таблиц.
+    Новые NOT NULL колонки должны иметь server_default или быть вычисляемыми.
+    """
+    preparer = connection.dialect.identifier_preparer
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"))
+
+def _create_missing_indexes(connection):
+    """
+    Создает индексы, добавленные в модели после создания таблиц.
+    create_all не трогает уже существующие таблицы.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
 
 # Функция для удаления таблиц (для тестов)
 async def drop_tables():
@@ -75,4 +171,12 @@ async def check_db_connection():
         return True
     except Exception as e:
         print(f"Database connection error: {e}")
-        return False
\ No newline at end of file
+        return False
+
+# Функция для получения статистики пула
+def get_pool_status() -> dict:
+    """
+    Возвращает статистику пула соединений текущего воркера.
+    Используется в health-эндпоинте для подбора размера пула.
+    """
+    return pool_stats.snapshot(engine.pool)
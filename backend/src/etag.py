@@ -0,0 +1,28 @@
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """Строгий ETag из версии данных (и id ресурса)"""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Слабое сравнение If-None-Match с ETag (RFC 9110, 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def conditional_get(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Возвращает 304, если у клиента актуальная версия, иначе добавляет ETag к ответу.
+    Вызывается до построения тела ответа.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,171 @@
+"""
+Рассылка изменений групп и студентов клиентам через Server-Sent Events.
+
+Каждый воркер uvicorn держит свое соединение asyncpg с LISTEN на канале журнала изменений.
+NOTIFY отправляется при коммите любой транзакции, записавшей изменения (src/crud/changes.py),
+в любом воркере. Получив уведомление, воркер один раз читает журнал с последнего seq и раздает
+событие своим подписчикам. Очередь подписчика ограничена: клиент, который не успевает читать,
+отключается и при переподключении догоняет изменения по Last-Event-ID.
+
+Это же соединение слушает канал версии данных для кэша ответов (src/data_version.py)
+и канал сброса кэша проверенных токенов (src/cache.py): кэш токенов работает, только пока
+соединение подключено.
+"""
+import asyncio
+import contextlib
+import logging
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from src.cache import on_principals_notify, set_principal_cache_enabled
+from src.changefeed import build_changes_payload
+from src.config import settings
+from src.crud import changes as changes_crud
+from src.crud import counters
+from src.crud import user as user_crud
+from src.data_version import data_version
+from src.database import AsyncSessionLocal
+from src.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 5.0
+
+
+def format_event(payload: dict) -> bytes:
+    return b"id: %d\nevent: changes\ndata: %s\n\n" % (payload["last_seq"], dumps(payload))
+
+
+async def iter_change_events(db, since: int):
+    """События с изменениями после since (пачками по PAGE_SIZE_MAX сущностей)."""
+    while True:
+        payload = await build_changes_payload(db, since, settings.PAGE_SIZE_MAX)
+        if payload["last_seq"] == since:
+            return
+        payload["since"] = since
+        since = payload["last_seq"]
+        yield since, format_event(payload)
+        if not payload["has_more"]:
+            return
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        # Элементы: (last_seq, событие) или None — подписчик отключен
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+
+class ChangeBroadcaster:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: set[Subscriber] = set()
+        self.last_seq = 0
+        self.notified_seq = 0
+        self.events_total = 0
+        self.dropped_total = 0
+        self.connected = False
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        async with AsyncSessionLocal() as db:
+            self.last_seq = self.notified_seq = await changes_crud.get_last_seq(db)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        for subscriber in list(self.subscribers):
+            self._drop(subscriber)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "subscribers": len(self.subscribers),
+            "last_seq": self.last_seq,
+            "events_total": self.events_total,
+            "dropped_total": self.dropped_total,
+        }
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            seq = int(payload)
+        except ValueError:
+            return
+        if seq > self.notified_seq:
+            self.notified_seq = seq
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(changes_crud.CHANGES_CHANNEL, self._on_notify)
+                await connection.add_listener(counters.DATA_VERSION_CHANNEL, data_version.on_notify)
+                await connection.add_listener(user_crud.PRINCIPALS_CHANNEL, on_principals_notify)
+                # Обрыв соединения сразу отключает кэш токенов, не дожидаясь heartbeat
+                connection.add_termination_listener(lambda _: self._listener_lost())
+                set_principal_cache_enabled(True)
+                self.connected = True
+                # После (пере)подключения догоняем изменения, NOTIFY о которых могли пропустить
+                self._wakeup.set()
+                while not connection.is_closed():
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        continue
+                    self._wakeup.clear()
+                    await self._publish()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка слушателя изменений, переподключение через %s с", RECONNECT_DELAY_SECONDS)
+            finally:
+                self._listener_lost()
+                if connection is not None:
+                    with contextlib.suppress(Exception):
+                        await connection.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    def _listener_lost(self) -> None:
+        self.connected = False
+        set_principal_cache_enabled(False)
+
+    async def _publish(self) -> None:
+        if not self.subscribers:
+            # Некому отправлять: журнал не читаем, новые подписчики догонят сами
+            self.last_seq = max(self.last_seq, self.notified_seq)
+            return
+        async with AsyncSessionLocal() as db:
+            async for seq, event in iter_change_events(db, self.last_seq):
+                self.last_seq = seq
+                self.events_total += 1
+                for subscriber in list(self.subscribers):
+                    try:
+                        subscriber.queue.put_nowait((seq, event))
+                    except asyncio.QueueFull:
+                        self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        """Отключает подписчика: очередь очищается, генератор потока получает None и завершается."""
+        self.subscribers.discard(subscriber)
+        self.dropped_total += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+
+broadcaster = ChangeBroadcaster(settings.SSE_QUEUE_SIZE)
@@ -0,0 +1,75 @@
+"""
+Потоковая выгрузка студентов в CSV/NDJSON.
+
+Строки читаются из БД серверным курсором через отдельную сессию,
+поэтому ответ начинает отдаваться сразу, а память не зависит от объема выгрузки.
+CSV совместим с импортом ведомости (группа, ФИО, оценки в первых столбцах).
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal
+
+from src.crud import student as student_crud
+from src.database import AsyncSessionLocal
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_FIELDS = ("group_name", "fio", "score_1", "score_2", "score_3", "total_score", "id", "group_id")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(
+        [row.group_name, row.fio, row.score_1, row.score_2, row.score_3, row.total_score, row.id, row.group_id]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(
+            {
+                "id": row.id,
+                "fio": row.fio,
+                "score_1": row.score_1,
+                "score_2": row.score_2,
+                "score_3": row.score_3,
+                "total_score": row.total_score,
+                "group_id": row.group_id,
+                "group_name": row.group_name,
+            },
+            ensure_ascii=False,
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+async def export_students(
+    export_format: ExportFormat,
+    batch_size: int,
+    group_id: int | None = None,
+    search: str | None = None,
+    status: str | None = None,
+) -> AsyncIterator[bytes]:
+    """Генератор тела ответа: одна пачка строк из курсора — один чанк."""
+    if export_format == "csv":
+        # BOM, чтобы Excel открыл UTF-8 с кириллицей
+        yield ("\ufeff" + _csv_chunk((), header=True)).encode("utf-8")
+
+    async with AsyncSessionLocal() as db:
+        async for rows in student_crud.stream_students_export(
+            db, batch_size, group_id=group_id, search=search, status=status
+        ):
+            chunk = _csv_chunk(rows) if export_format == "csv" else _ndjson_chunk(rows)
+            yield chunk.encode("utf-8")
@@ -0,0 +1,129 @@
+"""
+Чтение ведомостей студентов из CSV/XLSX.
+
+Каждая строка файла: название группы, ФИО, оценка 1, оценка 2, оценка 3.
+Строка заголовка (первая ячейка "группа"/"group"/"group_name") пропускается.
+"""
+import codecs
+import csv
+from typing import IO, Iterator, NamedTuple
+
+from src.utils import normalize_student_score
+
+HEADER_NAMES = {"группа", "group", "group_name"}
+GROUP_NAME_MAX_LENGTH = 150
+FIO_MAX_LENGTH = 255
+
+
+class RosterFormatError(ValueError):
+    """Файл не удается прочитать как CSV/XLSX"""
+
+
+class RosterRecord(NamedTuple):
+    row_no: int
+    group_name: str
+    fio: str
+    score_1: str | None
+    score_2: str | None
+    score_3: str | None
+
+
+def _cell_to_str(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _iter_csv_rows(file: IO[bytes]) -> Iterator[list]:
+    sample = file.read(4096).decode("utf-8-sig", errors="ignore")
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        yield from csv.reader(codecs.iterdecode(file, "utf-8-sig"), dialect)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise RosterFormatError(f"Не удалось прочитать CSV: {e}") from e
+
+
+def _iter_xlsx_rows(file: IO[bytes]) -> Iterator[tuple]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise RosterFormatError("Импорт XLSX недоступен: не установлен openpyxl") from e
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise RosterFormatError(f"Не удалось прочитать XLSX: {e}") from e
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+class RosterReader:
+    """
+    Потоково читает файл и отдает проверенные строки.
+    Ошибки строк (с номером строки файла) накапливаются в errors.
+    Чтение синхронное: из асинхронного кода итерируйте batches() в пуле потоков.
+    """
+
+    def __init__(self, file: IO[bytes], filename: str | None, max_errors: int):
+        self.file = file
+        self.is_xlsx = (filename or "").lower().endswith(".xlsx")
+        self.max_errors = max_errors
+        self.errors: list[dict] = []
+        self.errors_total = 0
+
+    def _add_error(self, row_no: int, error: str) -> None:
+        self.errors_total += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_no, "error": error})
+
+    def _validate(self, row_no: int, row) -> RosterRecord | None:
+        cells = [_cell_to_str(value) for value in row]
+        cells += [""] * (5 - len(cells))
+        group_name, fio = cells[0], cells[1]
+        if not group_name:
+            self._add_error(row_no, "Не указана группа")
+            return None
+        if len(group_name) > GROUP_NAME_MAX_LENGTH:
+            self._add_error(row_no, "Слишком длинное название группы")
+            return None
+        if not fio:
+            self._add_error(row_no, "Не указано ФИО")
+            return None
+        if len(fio) > FIO_MAX_LENGTH:
+            self._add_error(row_no, "Слишком длинное ФИО")
+            return None
+        try:
+            scores = [normalize_student_score(cell or None) for cell in cells[2:5]]
+        except ValueError as e:
+            self._add_error(row_no, str(e))
+            return None
+        return RosterRecord(row_no, group_name, fio, *scores)
+
+    def __iter__(self) -> Iterator[RosterRecord]:
+        rows = _iter_xlsx_rows(self.file) if self.is_xlsx else _iter_csv_rows(self.file)
+        for row_no, row in enumerate(rows, start=1):
+            if not row or not any(_cell_to_str(value) for value in row):
+                continue
+            if row_no == 1 and _cell_to_str(row[0]).lower() in HEADER_NAMES:
+                continue
+            record = self._validate(row_no, row)
+            if record is not None:
+                yield record
+
+    def batches(self, batch_size: int) -> Iterator[list[RosterRecord]]:
+        """Проверенные строки пачками по batch_size"""
+        batch = []
+        for record in self:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
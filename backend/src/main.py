@@ -1,14 +1,26 @@
 import asyncio
+import logging
 
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src import request_stats
 from src.auth import router as auth_router
+from src.compression import CompressionMiddleware
 from src.config import settings
-from src.database import check_db_connection, create_tables
+from src.crud import counters as counters_crud
+from src.database import AsyncSessionLocal, check_db_connection, create_tables, engine
+from src.events import broadcaster
+from src.metrics import MetricsMiddleware, instrument_engine, stats_sampler
+from src.routers.changes import router as changes_router
+from src.routers.events import router as events_router
 from src.routers.group import router as group_router
+from src.routers.health import router as health_router
+from src.routers.metrics import router as metrics_router
+from src.routers.search import router as search_router
 from src.routers.student import router as student_router
 from src.routers.user import router as user_router
+from src.utils import password_hasher
 
 app = FastAPI(
     title="Students API",
@@ -26,20 +38,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+)
+
+if settings.METRICS_ENABLED:
+    # Снаружи сжатия (добавлена после него): время ответа включает сжатие
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+
+if settings.REQUEST_STATS_ENABLED:
+    app.add_middleware(
+        request_stats.RequestStatsMiddleware,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+        server_timing=settings.SERVER_TIMING_ENABLED,
+    )
+    request_stats.instrument_engine(engine)
+
+if settings.DEBUG:
+    # Строки учета запросов (src.request_stats) и остальные debug-сообщения приложения
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("src").setLevel(logging.DEBUG)
+
 @app.on_event("startup")
 async def startup_event():
     await create_tables()
+    async with AsyncSessionLocal() as db:
+        await counters_crud.ensure_counters(db)
+    await broadcaster.start()
+    if settings.METRICS_ENABLED:
+        stats_sampler.start(settings.METRICS_SAMPLE_SECONDS)
     if await check_db_connection():
         print("✅ Database connection successful")
     else:
         print("❌ Database connection failed")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if settings.METRICS_ENABLED:
+        await stats_sampler.stop()
+    await broadcaster.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
+
 main_router = APIRouter(prefix="/api")
 main_router.include_router(auth_router, prefix="/auth", tags=["Auth"])
 main_router.include_router(user_router, tags=["Users"])
 main_router.include_router(group_router, tags=["Groups"])
 main_router.include_router(student_router, tags=["Students"])
+main_router.include_router(search_router, tags=["Search"])
+main_router.include_router(changes_router, tags=["Changes"])
+main_router.include_router(events_router, tags=["Events"])
+main_router.include_router(health_router, tags=["Health"])
 
 app.include_router(main_router)
 
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+
 
@@ -0,0 +1,59 @@
+"""
+Служебные команды.
+
+Использование:
+    python -m src.manage counters verify   # показать расхождения счетчиков (код возврата 1, если есть)
+    python -m src.manage counters repair   # пересчитать счетчики по фактическим данным
+    python -m src.manage changes prune --keep-days 30   # удалить старые записи журнала изменений
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from src.crud import changes as changes_crud
+from src.crud import counters as counters_crud
+from src.database import AsyncSessionLocal, engine
+
+
+async def _counters(action: str) -> int:
+    async with AsyncSessionLocal() as db:
+        if action == "verify":
+            drift = await counters_crud.verify_counters(db)
+        else:
+            drift = await counters_crud.repair_counters(db)
+    await engine.dispose()
+    print(json.dumps(drift, ensure_ascii=False, indent=2))
+    has_drift = bool(drift["groups"] or drift["counters"])
+    return 1 if action == "verify" and has_drift else 0
+
+
+async def _prune_changes(keep_days: int) -> int:
+    async with AsyncSessionLocal() as db:
+        pruned = await changes_crud.prune_changes(db, keep_days)
+    await engine.dispose()
+    print(f"Удалено записей журнала изменений: {pruned}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    counters_parser = commands.add_parser("counters", help="Проверка и восстановление счетчиков")
+    counters_parser.add_argument("action", choices=["verify", "repair"])
+
+    changes_parser = commands.add_parser("changes", help="Журнал изменений для синхронизации клиентов")
+    changes_parser.add_argument("action", choices=["prune"])
+    changes_parser.add_argument("--keep-days", type=int, default=30, help="Сколько дней хранить записи")
+
+    args = parser.parse_args()
+    if args.command == "counters":
+        return asyncio.run(_counters(args.action))
+    if args.command == "changes":
+        return asyncio.run(_prune_changes(args.keep_days))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Метрики Prometheus: /metrics.
+
+При нескольких воркерах uvicorn задайте переменную окружения PROMETHEUS_MULTIPROC_DIR
+(пустой каталог, очищается перед запуском): каждый воркер пишет значения в свои файлы,
+а /metrics любого воркера суммирует их по всем. Без переменной отдаются метрики
+обработавшего запрос воркера.
+
+- HTTP: ASGI-middleware считает запросы, статусы и время ответа по шаблону маршрута
+  (/api/groups/{group_id}), а не по фактическому пути, чтобы число рядов не росло.
+- БД: события before/after_cursor_execute движка — число и длительность запросов.
+- Пул соединений, очередь bcrypt, кэш ответов и подписчики SSE: фоновая задача воркера
+  раз в METRICS_SAMPLE_SECONDS переносит их статистику в метрики.
+"""
+import asyncio
+import contextlib
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.cache import response_cache
+from src.database import get_pool_status
+from src.events import broadcaster
+from src.utils import password_hasher
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Маршрут не найден (404 до роутинга): один ряд вместо ряда на каждый путь
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Обработанные HTTP-запросы", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP-запросы в обработке (без открытых потоков SSE)",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения SQL-запроса",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY")
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Размер пула соединений", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Соединения, выданные из пула", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Соединения сверх pool_size", multiprocess_mode="livesum")
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Выдачи соединений из пула")
+DB_POOL_WAIT = Counter("db_pool_wait_seconds_total", "Суммарное ожидание соединения из пула")
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Таймауты ожидания соединения из пула")
+
+BCRYPT_PENDING = Gauge("bcrypt_pending", "Проверки и хеширование паролей в работе", multiprocess_mode="livesum")
+BCRYPT_QUEUE_DEPTH = Gauge("bcrypt_queue_depth", "Задачи bcrypt, ожидающие потока", multiprocess_mode="livesum")
+
+RESPONSE_CACHE_HITS = Counter("response_cache_hits_total", "Попадания в кэш ответов")
+RESPONSE_CACHE_MISSES = Counter("response_cache_misses_total", "Промахи кэша ответов")
+RESPONSE_CACHE_BYTES = Gauge("response_cache_bytes", "Память, занятая кэшем ответов", multiprocess_mode="livesum")
+RESPONSE_CACHE_ENTRIES = Gauge("response_cache_entries", "Записи в кэше ответов", multiprocess_mode="livesum")
+
+SSE_SUBSCRIBERS = Gauge("sse_subscribers", "Открытые потоки /api/events", multiprocess_mode="livesum")
+SSE_DROPPED = Counter("sse_dropped_total", "Отключенные медленные подписчики /api/events")
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Шаблон маршрута для метки route: сегменты пути со значениями параметров заменяются
+    на {имя} (/api/groups/5 -> /api/groups/{group_id}). Не зависит от того, как FastAPI
+    хранит маршруты вложенных роутеров.
+    """
+    if scope.get("route") is None:
+        return UNMATCHED_ROUTE
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join(f"{{{params[segment]}}}" if segment in params else segment for segment in scope["path"].split("/"))
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        streaming = False
+        HTTP_IN_PROGRESS.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if content_type.startswith("text/event-stream"):
+                    # Поток SSE открыт часами: не учитываем его во времени ответа и в запросах в работе
+                    streaming = True
+                    HTTP_IN_PROGRESS.dec()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route_path = route_template(scope)
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+            if not streaming:
+                HTTP_IN_PROGRESS.dec()
+                HTTP_REQUEST_DURATION.labels(method, route_path).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Время каждого SQL-запроса движка в db_query_duration_seconds"""
+    observers = {operation: DB_QUERY_DURATION.labels(operation) for operation in DB_OPERATIONS}
+    other = DB_QUERY_DURATION.labels("OTHER")
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        operation = statement[:32].split(None, 1)[0].upper()
+        observers.get(operation, other).observe(elapsed)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(context):
+        # after_cursor_execute для упавшего запроса не вызывается
+        if context.connection is not None and context.cursor is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                started.pop()
+
+
+class StatsSampler:
+    """Переносит статистику воркера (пул, bcrypt, кэш, SSE) в метрики"""
+
+    def __init__(self):
+        self._last: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+
+    def _advance(self, counter: Counter, name: str, value: float) -> None:
+        """Счетчики воркера растут монотонно: в метрику добавляется прирост с прошлого замера"""
+        delta = value - self._last.get(name, 0)
+        if delta > 0:
+            counter.inc(delta)
+        self._last[name] = value
+
+    def sample(self) -> None:
+        pool = get_pool_status()
+        DB_POOL_SIZE.set(pool["size"])
+        DB_POOL_CHECKED_OUT.set(pool["checked_out"])
+        DB_POOL_OVERFLOW.set(pool["overflow"])
+        self._advance(DB_POOL_CHECKOUTS, "checkouts", pool["checkouts"])
+        self._advance(DB_POOL_WAIT, "wait_time_total", pool["wait_time_total"])
+        self._advance(DB_POOL_TIMEOUTS, "timeouts", pool["timeouts"])
+
+        BCRYPT_PENDING.set(password_hasher.pending)
+        BCRYPT_QUEUE_DEPTH.set(password_hasher.queue_depth)
+
+        cache = response_cache.stats()
+        RESPONSE_CACHE_BYTES.set(cache["bytes"])
+        RESPONSE_CACHE_ENTRIES.set(cache["entries"])
+        self._advance(RESPONSE_CACHE_HITS, "cache_hits", cache["hits"])
+        self._advance(RESPONSE_CACHE_MISSES, "cache_misses", cache["misses"])
+
+        events = broadcaster.stats()
+        SSE_SUBSCRIBERS.set(events["subscribers"])
+        self._advance(SSE_DROPPED, "sse_dropped", events["dropped_total"])
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if MULTIPROCESS:
+            # Gauge livesum завершившегося воркера больше не учитываются
+            multiprocess.mark_process_dead(os.getpid())
+
+
+stats_sampler = StatsSampler()
+
+
+def metrics_response() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
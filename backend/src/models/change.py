@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, func
+
+from src.models.base import Base
+
+
+class Change(Base):
+    """
+    Журнал изменений групп и студентов для инкрементальной синхронизации клиентов.
+    seq растет монотонно и в порядке коммитов (см. src/crud/changes.py).
+    """
+
+    __tablename__ = "changes"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<Change(seq={self.seq}, entity={self.entity}, entity_id={self.entity_id}, op={self.op})>"
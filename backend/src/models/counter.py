@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, String
+
+from src.models.base import Base
+
+
+class Counter(Base):
+    """Глобальные счетчики (количество студентов и групп), обновляются в crud"""
+
+    __tablename__ = "counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<Counter(name={self.name}, value={self.value})>"
@@ -1,7 +1,20 @@
-from sqlalchemy import CheckConstraint, Column, ForeignKey, Integer, String
+from sqlalchemy import BigInteger, CheckConstraint, Column, Computed, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.models.base import Base
+from src.utils import STUDENT_SCORE_VALUES
+
+
+def _score_value_sql(column: str) -> str:
+    """SQL-выражение числового значения оценки (аналог utils.student_score_to_int)."""
+    cases = " ".join(f"WHEN '{score}' THEN {value}" for score, value in STUDENT_SCORE_VALUES.items())
+    return f"CASE {column} {cases} ELSE 0 END"
+
+
+# Сумма оценок студента (аналог utils.student_total_score)
+STUDENT_TOTAL_SCORE_SQL = " + ".join(
+    _score_value_sql(column) for column in ("score_1", "score_2", "score_3")
+)
 
 
 class Group(Base):
@@ -10,6 +23,11 @@ class Group(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(150), unique=True, nullable=False)
     control_sum = Column(Integer, nullable=False)
+    # Счетчики, поддерживаемые crud (см. src/crud/counters.py)
+    students_quantity = Column(Integer, nullable=False, default=0, server_default="0")
+    excluded_students_quantity = Column(Integer, nullable=False, default=0, server_default="0")
+    # Версия группы и ее студентов для ETag (увеличивается crud при каждом изменении)
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
 
     students = relationship(
         "Student",
@@ -18,6 +36,18 @@ class Group(Base):
         passive_deletes=True,
     )
 
+    __table_args__ = (
+        # Ключ keyset-пагинации списка групп
+        Index("ix_groups_name_id", "name", "id"),
+        # Нечеткий поиск по названию (pg_trgm)
+        Index(
+            "ix_groups_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<Group(id={self.id}, name={self.name})>"
 
@@ -30,6 +60,7 @@ class Student(Base):
     score_1 = Column(String(1), nullable=True)
     score_2 = Column(String(1), nullable=True)
     score_3 = Column(String(1), nullable=True)
+    total_score = Column(Integer, Computed(STUDENT_TOTAL_SCORE_SQL, persisted=True), nullable=False)
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
 
     group = relationship("Group", back_populates="students")
@@ -47,6 +78,17 @@ class Student(Base):
             "(score_3 IN ('5','4','3','2','н')) OR score_3 IS NULL",
             name="ck_students_score_3_values",
         ),
+        # Недопущенные студенты группы: group_id = X AND total_score < control_sum
+        Index("ix_students_group_id_total_score", "group_id", "total_score"),
+        # Ключ keyset-пагинации списка студентов
+        Index("ix_students_fio_id", "fio", "id"),
+        # Нечеткий поиск и поиск подстроки по ФИО (pg_trgm)
+        Index(
+            "ix_students_fio_trgm",
+            "fio",
+            postgresql_using="gin",
+            postgresql_ops={"fio": "gin_trgm_ops"},
+        ),
     )
 
     def __repr__(self) -> str:
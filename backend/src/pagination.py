@@ -0,0 +1,39 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: tuple) -> str:
+    """Кодирует ключ последней записи страницы в непрозрачный курсор"""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None, types: tuple[type, ...]) -> tuple | None:
+    """Декодирует курсор и проверяет типы значений ключа"""
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(type(value) is value_type for value, value_type in zip(values, types))
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор")
+    return tuple(values)
+
+
+def keyset_page(rows: list, limit: int | None, key) -> tuple[list, str | None]:
+    """
+    Обрезает выборку из limit + 1 записей до страницы.
+    Возвращает записи страницы и курсор следующей страницы (None, если страница последняя).
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
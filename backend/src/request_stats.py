@@ -0,0 +1,132 @@
+"""
+Учет SQL-запросов и сериализации в пределах одного HTTP-запроса.
+
+Middleware создает RequestStats в contextvar на время запроса; события движка добавляют в него
+каждый SQL-запрос, src.serialization.dumps — время сериализации. Итог отдается в заголовке
+Server-Timing (виден во вкладке Network браузера) и пишется строкой в debug-лог.
+
+Сериализация измеряется только у ответов через src.serialization (FastJSONResponse, события SSE).
+Ответы по response_model FastAPI кодирует сам, не давая точки для замера: у них serialize
+в Server-Timing отсутствует, а в логе — "-".
+
+Поиск N+1: если один и тот же текст SQL (с плейсхолдерами вместо значений) выполнен за запрос
+больше N_PLUS_ONE_THRESHOLD раз, в лог пишется предупреждение с маршрутом и текстом запроса.
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Длина текста SQL в предупреждении о N+1
+STATEMENT_LOG_LENGTH = 300
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        # None — ответ кодировался без src.serialization и время сериализации неизвестно
+        self.serialize_time: float | None = None
+        self.statements: Counter[str] = Counter()
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        entries = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"']
+        if self.serialize_time is not None:
+            entries.append(f"serialize;dur={self.serialize_time * 1000:.1f}")
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.items() if count > threshold]
+
+
+_current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def record_serialization(elapsed: float) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.serialize_time = (stats.serialize_time or 0.0) + elapsed
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Учитывает SQL-запросы движка в RequestStats текущего HTTP-запроса"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            context._request_stats_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        started = getattr(context, "_request_stats_started", None)
+        if stats is None or started is None:
+            return
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+        stats.statements[statement] += 1
+
+
+class RequestStatsMiddleware:
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10, server_timing: bool = True):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    # Для потоковых ответов учтено только то, что выполнено до первого чанка
+                    MutableHeaders(raw=message["headers"]).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats, status_code)
+
+    def _report(self, scope: Scope, stats: RequestStats, status_code: int) -> None:
+        method, path = scope["method"], scope["path"]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s %s %d: %d SQL, db %.1f ms, serialize %s ms, total %.1f ms",
+                method,
+                path,
+                status_code,
+                stats.queries,
+                stats.db_time * 1000,
+                "-" if stats.serialize_time is None else f"{stats.serialize_time * 1000:.1f}",
+                (time.perf_counter() - stats.started) * 1000,
+            )
+        if self.n_plus_one_threshold <= 0:
+            return
+        for statement, count in stats.repeated_statements(self.n_plus_one_threshold):
+            logger.warning(
+                "Возможный N+1: %s %s выполнил один и тот же запрос %d раз: %s",
+                method,
+                path,
+                count,
+                " ".join(statement.split())[:STATEMENT_LOG_LENGTH],
+            )
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import get_current_user
+from src.changefeed import build_changes_payload
+from src.config import settings
+from src.crud import changes as changes_crud
+from src.database import get_db
+from src.schemas.changes import ChangesResponse
+from src.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+
+@router.get(
+    "",
+    response_model=ChangesResponse,
+    summary="Изменения групп и студентов",
+    description=(
+        "Группы и студенты, измененные после since, и удаленные (tombstones). "
+        "Без since возвращает только текущий last_seq — с него начинается синхронизация"
+    ),
+)
+async def list_changes(
+    since: int | None = Query(None, ge=0, description="last_seq из предыдущего ответа"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Максимум сущностей"),
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    if since is None:
+        return FastJSONResponse(
+            {
+                "groups": [],
+                "students": [],
+                "deleted_groups": [],
+                "deleted_students": [],
+                "last_seq": await changes_crud.get_last_seq(db),
+                "has_more": False,
+            }
+        )
+
+    if since < await changes_crud.get_pruned_seq(db):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE, detail="Журнал изменений уже очищен, нужна полная загрузка"
+        )
+    return FastJSONResponse(await build_changes_payload(db, since, limit))
@@ -0,0 +1,71 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import get_current_user
+from src.config import settings
+from src.crud import changes as changes_crud
+from src.database import AsyncSessionLocal, get_db
+from src.events import Subscriber, broadcaster, iter_change_events
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+async def _event_stream(since: int | None):
+    subscriber: Subscriber = broadcaster.subscribe()
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n".encode()
+        sent_seq = since
+        if since is not None:
+            async with AsyncSessionLocal() as db:
+                if since < await changes_crud.get_pruned_seq(db):
+                    # Догнать по журналу нельзя: клиент должен загрузить данные заново
+                    yield b"event: reset\ndata: {}\n\n"
+                    sent_seq = None
+                else:
+                    async for sent_seq, event in iter_change_events(db, since):
+                        yield event
+        while True:
+            try:
+                item = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if item is None:
+                return
+            seq, event = item
+            if sent_seq is not None and seq <= sent_seq:
+                # Уже отправлено при догонянии
+                continue
+            yield event
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+@router.get(
+    "",
+    summary="Поток изменений (Server-Sent Events)",
+    description=(
+        "События changes с тем же содержимым, что и GET /api/changes. "
+        "При переподключении передайте since или заголовок Last-Event-ID, чтобы получить пропущенное"
+    ),
+    response_class=StreamingResponse,
+)
+async def events(
+    request: Request,
+    since: int | None = Query(None, ge=0, description="Отправить изменения после этого seq"),
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    last_event_id = request.headers.get("last-event-id", "")
+    if since is None and last_event_id.isdigit():
+        since = int(last_event_id)
+    # Сессия нужна только для авторизации: не держим соединение из пула, пока открыт поток
+    await db.close()
+    return StreamingResponse(
+        _event_stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,35 +1,39 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import get_current_user
+from src.cache import response_cache
 from src.crud import group as group_crud
+from src.crud import student as student_crud
+from src.config import settings
+from src.data_version import get_data_version
 from src.database import get_db
-from src.schemas.group import GroupCreate, GroupDetailResponse, GroupResponse, GroupUpdate
-from src.schemas.student import StudentResponse
-from src.utils import student_total_score
+from src.etag import conditional_get, make_etag
+from src.pagination import decode_cursor, keyset_page
+from src.serialization import FastJSONResponse, student_payload
+from src.schemas.group import (
+    GroupCreate,
+    GroupDetailResponse,
+    GroupResponse,
+    GroupScoresResponse,
+    GroupScoresUpdate,
+    GroupUpdate,
+)
+from src.schemas.pagination import Page
 
 router = APIRouter(prefix="/groups", tags=["Groups"])
 
 
-def _build_group_payload(group, include_students: bool = False) -> dict:
-    students = group.students or []
-    students_quantity = len(students)
-    excluded_students_quantity = sum(
-        1
-        for student in students
-        if group.control_sum > student_total_score(student.score_1, student.score_2, student.score_3)
-    )
+def _build_group_payload(group, students: list | None = None) -> dict:
     payload = {
         "id": group.id,
         "name": group.name,
         "control_sum": group.control_sum,
-        "students_quantity": students_quantity,
-        "excluded_students_quantity": excluded_students_quantity,
+        "students_quantity": group.students_quantity,
+        "excluded_students_quantity": group.excluded_students_quantity,
     }
-    if include_students:
-        payload["students"] = [StudentResponse.model_validate(student) for student in students]
+    if students is not None:
+        payload["students"] = [student_payload(student) for student in students]
     return payload
 
 
@@ -38,6 +42,7 @@ def _build_group_payload(group, include_students: bool = False) -> dict:
     response_model=GroupResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Создать группу",
+    description="Создает группу; необязательный список students добавляется в той же транзакции",
 )
 async def create_group(
     group_create: GroupCreate,
@@ -49,8 +54,12 @@ async def create_group(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Группа с таким названием уже существует"
         )
-    group = await group_crud.create_group(db, group_create.name, group_create.control_sum)
-    group = await group_crud.get_group_by_id(db, group.id, with_students=True)
+    group = await group_crud.create_group(
+        db,
+        group_create.name,
+        group_create.control_sum,
+        students=[student.model_dump() for student in group_create.students],
+    )
     return _build_group_payload(group)
 
 
@@ -65,7 +74,7 @@ async def update_group(
     db: AsyncSession = Depends(get_db),
     _: object = Depends(get_current_user),
 ):
-    group = await group_crud.get_group_by_id(db, group_id, with_students=True)
+    group = await group_crud.get_group_by_id(db, group_id)
     if not group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Группа не найдена")
 
@@ -81,10 +90,50 @@ async def update_group(
             )
 
     group = await group_crud.update_group(db, group, update_data)
-    group = await group_crud.get_group_by_id(db, group.id, with_students=True)
     return _build_group_payload(group)
 
 
+@router.patch(
+    "/{group_id}/scores",
+    response_model=GroupScoresResponse,
+    summary="Изменить оценки студентов группы",
+    description=(
+        "Применяет список правок (student_id, field, value) в одной транзакции. "
+        "Повторные правки одной ячейки: действует последняя"
+    ),
+)
+async def update_group_scores(
+    group_id: int,
+    scores_update: GroupScoresUpdate,
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    group = await group_crud.get_group_by_id(db, group_id)
+    if not group:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Группа не найдена")
+
+    edits: dict[int, dict[str, str | None]] = {}
+    for edit in scores_update.edits:
+        edits.setdefault(edit.student_id, {})[edit.field] = edit.value
+
+    found_ids = await student_crud.lock_group_students(db, group_id, edits)
+    missing_ids = sorted(set(edits) - found_ids)
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Студенты не найдены в группе: {', '.join(map(str, missing_ids))}",
+        )
+
+    updated = await student_crud.update_group_scores(db, group_id, edits)
+    await db.refresh(group)
+    return {
+        "group_id": group.id,
+        "updated": updated,
+        "students_quantity": group.students_quantity,
+        "excluded_students_quantity": group.excluded_students_quantity,
+    }
+
+
 @router.delete(
     "/{group_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -103,31 +152,81 @@ async def delete_group(
 
 @router.get(
     "",
-    response_model=List[GroupResponse],
+    response_model=Page[GroupResponse],
     summary="Получить список групп",
+    description="Постраничный список групп, упорядоченный по (name, id). Поддерживает If-None-Match",
 )
 async def list_groups(
+    request: Request,
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Размер страницы"),
+    unpaged: bool = Query(False, description="Вернуть весь список без пагинации"),
     db: AsyncSession = Depends(get_db),
     _: object = Depends(get_current_user),
 ):
-    groups = await group_crud.list_groups(db)
-    return [_build_group_payload(group) for group in groups]
+    data_version = await get_data_version(db)
+    not_modified = conditional_get(request, response, make_etag("groups", data_version))
+    if not_modified:
+        return not_modified
+
+    cache_key = ("groups", cursor, limit, unpaged)
+    body = response_cache.get(data_version, cache_key)
+    if body is not None:
+        return Response(body, media_type="application/json", headers=response.headers)
+
+    page_limit = None if unpaged else limit
+    groups = await group_crud.list_groups(
+        db,
+        after=None if unpaged else decode_cursor(cursor, (str, int)),
+        limit=None if page_limit is None else page_limit + 1,
+    )
+    groups, next_cursor = keyset_page(groups, page_limit, key=lambda group: (group.name, group.id))
+    result = FastJSONResponse(
+        {"items": [_build_group_payload(group) for group in groups], "next_cursor": next_cursor},
+        headers=response.headers,
+    )
+    response_cache.set(data_version, cache_key, result.body)
+    return result
 
 
 @router.get(
     "/{group_id}",
     response_model=GroupDetailResponse,
     summary="Получить группу",
+    description="Группа со студентами. Поддерживает If-None-Match",
 )
 async def get_group(
     group_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _: object = Depends(get_current_user),
 ):
-    group = await group_crud.get_group_by_id(db, group_id, with_students=True)
+    data_version = await get_data_version(db)
+    cache_key = ("group", group_id)
+    cached = response_cache.get(data_version, cache_key)
+    if cached is not None:
+        etag, body = cached
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        return Response(body, media_type="application/json", headers=response.headers)
+
+    version = await group_crud.get_group_version(db, group_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Группа не найдена")
+    etag = make_etag("group", group_id, version)
+    not_modified = conditional_get(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    group = await group_crud.get_group_by_id(db, group_id)
     if not group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Группа не найдена")
-    payload = _build_group_payload(group, include_students=True)
-    return payload
+    students = await student_crud.list_group_students(db, group_id)
+    result = FastJSONResponse(_build_group_payload(group, students=students), headers=response.headers)
+    response_cache.set(data_version, cache_key, (etag, result.body), size=len(result.body))
+    return result
 
 
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from src.cache import response_cache
+from src.database import check_db_connection, get_pool_status
+from src.events import broadcaster
+from src.utils import password_hasher
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get(
+    "",
+    summary="Состояние сервиса",
+    description=(
+        "Проверка подключения к БД, статистика пула соединений, очереди bcrypt "
+        "подписчиков потока изменений и кэша ответов текущего воркера"
+    ),
+)
+async def health():
+    database_ok = await check_db_connection()
+    return {
+        "status": "ok" if database_ok else "degraded",
+        "database": database_ok,
+        "pool": get_pool_status(),
+        "password_hasher": password_hasher.stats(),
+        "events": broadcaster.stats(),
+        "response_cache": response_cache.stats(),
+    }
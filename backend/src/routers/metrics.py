@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.metrics import metrics_response
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get(
+    "",
+    summary="Метрики Prometheus",
+    description="Метрики всех воркеров в формате Prometheus (при заданном PROMETHEUS_MULTIPROC_DIR)",
+    include_in_schema=False,
+)
+async def metrics():
+    return metrics_response()
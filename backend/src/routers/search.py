@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import get_current_user
+from src.config import settings
+from src.crud import group as group_crud
+from src.crud import student as student_crud
+from src.database import get_db
+from src.schemas.search import SearchResponse
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get(
+    "",
+    response_model=SearchResponse,
+    summary="Поиск студентов и групп",
+    description="Нечеткий поиск студентов по ФИО и групп по названию с учетом опечаток (pg_trgm)",
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=255, description="Поисковый запрос"),
+    limit: int = Query(
+        settings.SEARCH_LIMIT_DEFAULT, ge=1, le=settings.SEARCH_LIMIT_MAX, description="Максимум результатов каждого типа"
+    ),
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    query = q.strip()
+    # Порог похожести для оператора <% действует до конца текущей транзакции
+    await db.execute(
+        select(
+            func.set_config(
+                "pg_trgm.word_similarity_threshold", str(settings.SEARCH_SIMILARITY_THRESHOLD), True
+            )
+        )
+    )
+    students = await student_crud.search_students(db, query, limit)
+    groups = await group_crud.search_groups(db, query, limit)
+    return {
+        "students": [row._asdict() for row in students],
+        "groups": [row._asdict() for row in groups],
+    }
@@ -1,13 +1,29 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import get_current_user
 from src.crud import group as group_crud
 from src.crud import student as student_crud
+from src.config import settings
+from src.data_version import get_data_version
 from src.database import get_db
-from src.schemas.student import StudentCreate, StudentResponse, StudentUpdate, StudentWithGroupResponse
+from src.etag import conditional_get, make_etag
+from src.exporter import MEDIA_TYPES, ExportFormat, export_students
+from src.importer import RosterFormatError, RosterReader
+from src.pagination import decode_cursor, keyset_page
+from src.serialization import FastJSONResponse, student_payload
+from src.schemas.pagination import Page
+from src.schemas.student import (
+    ScoreUpdate,
+    StudentCreate,
+    StudentImportResponse,
+    StudentResponse,
+    StudentStatus,
+    StudentUpdate,
+    StudentWithGroupResponse,
+)
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
@@ -42,26 +58,155 @@ async def create_student(
 
 @router.get(
     "",
-    response_model=List[StudentWithGroupResponse],
+    response_model=Page[StudentWithGroupResponse],
     summary="Получить список студентов",
+    description=(
+        "Постраничный список студентов, упорядоченный по (fio, id), с фильтрами по группе, ФИО и допуску. "
+        "Поддерживает If-None-Match"
+    ),
 )
 async def list_students(
+    request: Request,
+    response: Response,
+    group_id: int | None = Query(None, description="Только студенты группы"),
+    q: str | None = Query(None, min_length=1, max_length=255, description="Подстрока ФИО"),
+    student_status: StudentStatus | None = Query(None, alias="status", description="Допущенные (allowed) или недопущенные (notAllowed)"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Размер страницы"),
+    unpaged: bool = Query(False, description="Вернуть весь список без пагинации"),
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    data_version = await get_data_version(db)
+    not_modified = conditional_get(request, response, make_etag("students", data_version))
+    if not_modified:
+        return not_modified
+
+    page_limit = None if unpaged else limit
+    students = await student_crud.list_students(
+        db,
+        after=None if unpaged else decode_cursor(cursor, (str, int)),
+        limit=None if page_limit is None else page_limit + 1,
+        group_id=group_id,
+        search=q.strip() if q else None,
+        status=student_status,
+    )
+    students, next_cursor = keyset_page(students, page_limit, key=lambda student: (student.fio, student.id))
+    items = []
+    for student in students:
+        payload = student_payload(student)
+        payload["group_name"] = student.group_name
+        items.append(payload)
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor}, headers=response.headers)
+
+
+@router.get(
+    "/export",
+    summary="Выгрузить студентов в CSV/NDJSON",
+    description="Потоковая выгрузка всех студентов (с теми же фильтрами, что и список), упорядоченная по (fio, id)",
+    response_class=StreamingResponse,
+)
+async def export_students_file(
+    export_format: ExportFormat = Query("csv", alias="format", description="csv или ndjson"),
+    group_id: int | None = Query(None, description="Только студенты группы"),
+    q: str | None = Query(None, min_length=1, max_length=255, description="Подстрока ФИО"),
+    student_status: StudentStatus | None = Query(None, alias="status", description="Допущенные (allowed) или недопущенные (notAllowed)"),
+    _: object = Depends(get_current_user),
+):
+    return StreamingResponse(
+        export_students(
+            export_format,
+            settings.EXPORT_BATCH_SIZE,
+            group_id=group_id,
+            search=q.strip() if q else None,
+            status=student_status,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="students.{export_format}"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=StudentImportResponse,
+    summary="Импорт студентов и оценок из CSV/XLSX",
+    description=(
+        "Файл со столбцами: группа, ФИО, оценка 1, оценка 2, оценка 3. "
+        "Новые студенты добавляются, у существующих (та же группа и ФИО) обновляются заполненные оценки"
+    ),
+)
+async def import_students(
+    file: UploadFile = File(..., description="CSV (UTF-8, разделитель , ; или табуляция) или XLSX"),
     db: AsyncSession = Depends(get_db),
     _: object = Depends(get_current_user),
 ):
-    students = await student_crud.list_students(db)
-    return [
-        StudentWithGroupResponse(
-            id=student.id,
-            fio=student.fio,
-            score_1=student.score_1,
-            score_2=student.score_2,
-            score_3=student.score_3,
-            group_id=student.group_id,
-            group_name=student.group.name if student.group else None,
-        )
-        for student in students
+    reader = RosterReader(file.file, file.filename, max_errors=settings.IMPORT_MAX_ERRORS)
+    # Чтение и разбор файла идут в пуле потоков, в цикле событий выполняется только COPY пачек
+    batches = iterate_in_threadpool(reader.batches(settings.IMPORT_BATCH_SIZE))
+    try:
+        result = await student_crud.import_students(db, batches)
+    except RosterFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    errors = reader.errors + [
+        {"row": row_no, "error": f"Группа не найдена: {group_name}"}
+        for row_no, group_name in result["unknown_group_rows"]
+    ] + [
+        {"row": row_no, "error": f"Повтор студента {fio}: используется строка {last_row_no}"}
+        for row_no, fio, last_row_no in result["duplicate_rows"]
     ]
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "inserted": result["inserted"],
+        "updated": result["updated"],
+        "errors_total": reader.errors_total + len(result["unknown_group_rows"]) + len(result["duplicate_rows"]),
+        "errors": errors[: settings.IMPORT_MAX_ERRORS],
+    }
+
+
+@router.get(
+    "/{student_id}",
+    response_model=StudentWithGroupResponse,
+    summary="Получить студента",
+)
+async def get_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    student = await student_crud.get_student_by_id(db, student_id, with_group=True)
+    if not student:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Студент не найден")
+    return StudentWithGroupResponse(
+        id=student.id,
+        fio=student.fio,
+        score_1=student.score_1,
+        score_2=student.score_2,
+        score_3=student.score_3,
+        total_score=student.total_score,
+        group_id=student.group_id,
+        group_name=student.group.name if student.group else None,
+    )
+
+
+@router.patch(
+    "/{student_id}",
+    response_model=StudentResponse,
+    summary="Изменить одну оценку студента",
+    description="Атомарно выставляет одно поле score_N (null очищает оценку)",
+)
+async def update_student_score(
+    student_id: int,
+    score_update: ScoreUpdate,
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(get_current_user),
+):
+    student = await student_crud.get_student_by_id(db, student_id, for_update=True)
+    if not student:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Студент не найден")
+
+    student = await student_crud.update_student(db, student, {score_update.field: score_update.value})
+    return StudentResponse.model_validate(student)
 
 
 @router.put(
@@ -75,7 +220,8 @@ async def update_student(
     db: AsyncSession = Depends(get_db),
     _: object = Depends(get_current_user),
 ):
-    student = await student_crud.get_student_by_id(db, student_id)
+    # Блокировка строки: старые group_id и total_score для счетчиков не устареют до коммита
+    student = await student_crud.get_student_by_id(db, student_id, for_update=True)
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Студент не найден")
 
@@ -102,7 +248,8 @@ async def delete_student(
     db: AsyncSession = Depends(get_db),
     _: object = Depends(get_current_user),
 ):
-    student = await student_crud.get_student_by_id(db, student_id)
+    # Блокировка строки: старые group_id и total_score для счетчиков не устареют до коммита
+    student = await student_crud.get_student_by_id(db, student_id, for_update=True)
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Студент не найден")
     await student_crud.delete_student(db, student)
@@ -1,14 +1,15 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth import get_current_user
-from src.crud import group as group_crud
-from src.crud import student as student_crud
+from src.auth import UserSnapshot, get_current_user
+from src.cache import response_cache
+from src.crud import counters as counters_crud
 from src.crud import user as user_crud
+from src.config import settings
+from src.data_version import get_data_version
 from src.database import get_db
-from src.models.user import User
+from src.pagination import decode_cursor, keyset_page
+from src.schemas.pagination import Page
 from src.schemas.user import UserMeResponse, UserResponse, UserUpdate
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -20,16 +21,20 @@ router = APIRouter(prefix="/users", tags=["Users"])
     summary="Получить информацию о текущем пользователе",
 )
 async def read_current_user(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    students_quantity = await student_crud.count_students(db)
-    groups_quantity = await group_crud.count_groups(db)
+    # Счетчики меняются вместе с версией данных: при неизменной версии они берутся из кэша
+    data_version = await get_data_version(db)
+    counters = response_cache.get(data_version, "counters")
+    if counters is None:
+        counters = await counters_crud.get_counters(db, counters_crud.STUDENTS, counters_crud.GROUPS)
+        response_cache.set(data_version, "counters", counters, size=0)
     user_payload = UserResponse.model_validate(current_user).model_dump()
     return UserMeResponse(
         **user_payload,
-        students_quantity=students_quantity,
-        groups_quantity=groups_quantity,
+        students_quantity=counters[counters_crud.STUDENTS],
+        groups_quantity=counters[counters_crud.GROUPS],
     )
 
 
@@ -40,7 +45,7 @@ async def read_current_user(
 )
 async def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     update_data = user_update.model_dump(exclude_unset=True)
@@ -55,12 +60,10 @@ async def update_current_user(
                 detail="User with this login already exists",
             )
 
-    for field, value in update_data.items():
-        setattr(current_user, field, value)
-
-    await db.commit()
-    await db.refresh(current_user)
-    return UserResponse.model_validate(current_user)
+    user = await user_crud.update_user(db, current_user.id, update_data)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return UserResponse.model_validate(user)
 
 @router.get("/{user_id}", 
     response_model=UserResponse,
@@ -80,16 +83,23 @@ async def get_user_by_id(
     return user
 
 @router.get("", 
-    response_model=List[UserResponse],
+    response_model=Page[UserResponse],
     summary="Получить список пользователей",
-    description="Получает список всех пользователей")
+    description="Получает постраничный список пользователей, упорядоченный по id")
 async def get_users(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: str | None = Query(None, description="Cursor of the next page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Number of records to return"),
+    unpaged: bool = Query(False, description="Return all records without pagination"),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить список пользователей"""
-
-    users = await user_crud.get_users(db, skip=skip, limit=limit)
-    return users
+    page_limit = None if unpaged else limit
+    after = None if unpaged else decode_cursor(cursor, (int,))
+    users = await user_crud.get_users(
+        db,
+        after_id=after[0] if after else None,
+        limit=None if page_limit is None else page_limit + 1,
+    )
+    users, next_cursor = keyset_page(users, page_limit, key=lambda user: (user.id,))
+    return {"items": users, "next_cursor": next_cursor}
 
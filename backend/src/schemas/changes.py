@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from src.schemas.group import GroupResponse
+from src.schemas.student import StudentWithGroupResponse
+
+
+class ChangesResponse(BaseModel):
+    # Текущее состояние измененных и созданных сущностей
+    groups: list[GroupResponse]
+    students: list[StudentWithGroupResponse]
+    # Удаленные сущности (tombstones)
+    deleted_groups: list[int]
+    deleted_students: list[int]
+    # Передать как since в следующем запросе
+    last_seq: int
+    has_more: bool
@@ -1,6 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from src.schemas.student import StudentResponse
+from src.schemas.student import ScoreEdit, StudentBase, StudentResponse
+
+# Правок оценок в одном запросе (строки VALUES в UPDATE)
+SCORE_EDITS_MAX = 1000
+# Студентов, создаваемых вместе с группой
+GROUP_STUDENTS_MAX = 1000
 
 
 class GroupBase(BaseModel):
@@ -9,7 +14,8 @@ class GroupBase(BaseModel):
 
 
 class GroupCreate(GroupBase):
-    pass
+    # Студенты создаются вместе с группой в одной транзакции
+    students: list[StudentBase] = Field([], max_length=GROUP_STUDENTS_MAX)
 
 
 class GroupUpdate(BaseModel):
@@ -30,3 +36,14 @@ class GroupDetailResponse(GroupResponse):
     students: list[StudentResponse]
 
 
+
+
+class GroupScoresUpdate(BaseModel):
+    edits: list[ScoreEdit] = Field(min_length=1, max_length=SCORE_EDITS_MAX)
+
+
+class GroupScoresResponse(BaseModel):
+    group_id: int
+    updated: int
+    students_quantity: int
+    excluded_students_quantity: int
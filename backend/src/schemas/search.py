@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class StudentSearchResult(BaseModel):
+    id: int
+    fio: str
+    group_id: int
+    group_name: str
+    rank: float
+
+
+class GroupSearchResult(BaseModel):
+    id: int
+    name: str
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    students: list[StudentSearchResult]
+    groups: list[GroupSearchResult]
@@ -1,6 +1,14 @@
+from typing import Literal
+
 from pydantic import BaseModel, field_validator
 
-from src.utils import ALLOWED_STUDENT_SCORES
+from src.utils import normalize_student_score
+
+# Поля оценок студента
+ScoreField = Literal["score_1", "score_2", "score_3"]
+
+# Фильтр допуска: сумма оценок >= control_sum группы (allowed) или меньше нее (notAllowed)
+StudentStatus = Literal["allowed", "notAllowed"]
 
 
 class StudentBase(BaseModel):
@@ -12,12 +20,7 @@ class StudentBase(BaseModel):
     @field_validator("score_1", "score_2", "score_3")
     @classmethod
     def validate_score(cls, value: str | None) -> str | None:
-        if value is None:
-            return value
-        cleaned_value = value.strip()
-        if cleaned_value not in ALLOWED_STUDENT_SCORES:
-            raise ValueError(f"Оценка должна быть в {ALLOWED_STUDENT_SCORES}")
-        return cleaned_value
+        return normalize_student_score(value)
 
 
 class StudentCreate(StudentBase):
@@ -34,17 +37,13 @@ class StudentUpdate(BaseModel):
     @field_validator("score_1", "score_2", "score_3")
     @classmethod
     def validate_score(cls, value: str | None) -> str | None:
-        if value is None:
-            return value
-        cleaned_value = value.strip()
-        if cleaned_value not in ALLOWED_STUDENT_SCORES:
-            raise ValueError(f"Оценка должна быть в {ALLOWED_STUDENT_SCORES}")
-        return cleaned_value
+        return normalize_student_score(value)
 
 
 class StudentResponse(StudentBase):
     id: int
     group_id: int
+    total_score: int = 0
 
     class Config:
         from_attributes = True
@@ -54,3 +53,27 @@ class StudentWithGroupResponse(StudentResponse):
     group_name: str | None = None
 
 
+class StudentImportError(BaseModel):
+    row: int
+    error: str
+
+
+class StudentImportResponse(BaseModel):
+    inserted: int
+    updated: int
+    errors_total: int
+    errors: list[StudentImportError]
+
+
+class ScoreUpdate(BaseModel):
+    field: ScoreField
+    value: str | None = None
+
+    @field_validator("value")
+    @classmethod
+    def validate_score(cls, value: str | None) -> str | None:
+        return normalize_student_score(value)
+
+
+class ScoreEdit(ScoreUpdate):
+    student_id: int
@@ -0,0 +1,47 @@
+"""
+Быстрая сериализация больших списков в JSON.
+
+Эндпоинты списков собирают словари из строк БД и отдают FastJSONResponse:
+ответ сразу кодируется в байты (orjson, а без него — pydantic_core.to_json),
+без создания Pydantic-моделей на каждую строку и без повторной проверки по response_model.
+response_model у таких эндпоинтов остается только для документации OpenAPI.
+"""
+import time
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from src.request_stats import record_serialization
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    started = time.perf_counter()
+    try:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return to_json(content)
+    finally:
+        record_serialization(time.perf_counter() - started)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def student_payload(student) -> dict:
+    """Поля StudentResponse без создания Pydantic-модели"""
+    return {
+        "id": student.id,
+        "fio": student.fio,
+        "score_1": student.score_1,
+        "score_2": student.score_2,
+        "score_3": student.score_3,
+        "group_id": student.group_id,
+        "total_score": student.total_score,
+    }
@@ -1,5 +1,10 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
+from src.config import settings
+
 # Допустимые значения для оценок студентов
 ALLOWED_STUDENT_SCORES = {"5", "4", "3", "2", "н"}
 STUDENT_SCORE_VALUES = {
@@ -29,6 +34,67 @@ def get_password_hash(password: str) -> str:
     return hashed.decode("utf-8")
 
 
+class PasswordHasher:
+    """
+    Выполняет bcrypt в отдельном ограниченном пуле потоков, чтобы не блокировать event loop.
+    Запросы сверх PASSWORD_HASH_WORKERS ждут в очереди пула.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.pending = 0
+        self.completed = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество задач, ожидающих свободного потока"""
+        return max(self.pending - self.max_workers, 0)
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
+def normalize_student_score(score: str | None) -> str | None:
+    """Проверяет оценку и убирает пробелы. Бросает ValueError для недопустимого значения."""
+    if score is None:
+        return score
+    cleaned_score = score.strip()
+    if cleaned_score not in ALLOWED_STUDENT_SCORES:
+        raise ValueError(f"Оценка должна быть в {ALLOWED_STUDENT_SCORES}")
+    return cleaned_score
+
+
 def student_score_to_int(score: str | None) -> int:
     """Преобразует символ оценки в числовой эквивалент."""
     if score is None:
@@ -4,13 +4,19 @@ import 'api_service.dart';
 class GroupsService {
   final ApiService _api = ApiService();
 
-  // GET /api/groups
+  // GET /api/groups (все страницы, по next_cursor)
   Future<List<Group>> getGroups() async {
-    final response = await _api.get('/api/groups');
-    final List<dynamic> groupsList = response as List<dynamic>;
-    return groupsList
-        .map((json) => Group.fromJson(json as Map<String, dynamic>))
-        .toList();
+    final groups = <Group>[];
+    String? cursor;
+    do {
+      final query = cursor == null ? '' : '?cursor=${Uri.encodeQueryComponent(cursor)}';
+      final response = await _api.get('/api/groups$query') as Map<String, dynamic>;
+      final List<dynamic> groupsList = response['items'] as List<dynamic>;
+      groups.addAll(
+          groupsList.map((json) => Group.fromJson(json as Map<String, dynamic>)));
+      cursor = response['next_cursor'] as String?;
+    } while (cursor != null);
+    return groups;
   }
 
   // GET /api/groups/{group_id}
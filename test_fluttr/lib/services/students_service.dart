@@ -4,13 +4,19 @@ import 'api_service.dart';
 class StudentsService {
   final ApiService _api = ApiService();
 
-  // GET /api/students
+  // GET /api/students (все страницы, по next_cursor)
   Future<List<Student>> getStudents() async {
-    final response = await _api.get('/api/students');
-    final List<dynamic> studentsList = response as List<dynamic>;
-    return studentsList
-        .map((json) => Student.fromJson(json as Map<String, dynamic>))
-        .toList();
+    final students = <Student>[];
+    String? cursor;
+    do {
+      final query = cursor == null ? '' : '?cursor=${Uri.encodeQueryComponent(cursor)}';
+      final response = await _api.get('/api/students$query') as Map<String, dynamic>;
+      final List<dynamic> studentsList = response['items'] as List<dynamic>;
+      students.addAll(studentsList
+          .map((json) => Student.fromJson(json as Map<String, dynamic>)));
+      cursor = response['next_cursor'] as String?;
+    } while (cursor != null);
+    return students;
   }
 
   // POST /api/students
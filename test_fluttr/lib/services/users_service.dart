@@ -26,10 +26,11 @@ class UsersService {
     return User.fromJson(response as Map<String, dynamic>);
   }
 
-  // GET /api/users
-  Future<List<User>> getUsers({int skip = 0, int limit = 100}) async {
-    final response = await _api.get('/api/users?skip=$skip&limit=$limit');
-    final List<dynamic> usersList = response as List<dynamic>;
+  // GET /api/users (одна страница; next_cursor передается в следующий вызов)
+  Future<List<User>> getUsers({String? cursor, int limit = 100}) async {
+    final query = cursor == null ? '' : '&cursor=${Uri.encodeQueryComponent(cursor)}';
+    final response = await _api.get('/api/users?limit=$limit$query') as Map<String, dynamic>;
+    final List<dynamic> usersList = response['items'] as List<dynamic>;
     return usersList
         .map((json) => User.fromJson(json as Map<String, dynamic>))
         .toList();
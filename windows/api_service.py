@@ -1,26 +1,84 @@
+import json
+import threading
 import requests
-from typing import List, Optional
+from typing import Callable, List, Optional
+from urllib3.util import make_headers
 from models import User, Group, Student, Grade
 
+# gzip/deflate, а также br и zstd, если установлены brotli и zstandard
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
 
 class ApiService:
     """Сервис для работы с API"""
     
+    PAGE_SIZE = 500
+    # Не больше, чем принимает сервер в одном запросе (SCORE_EDITS_MAX в backend/src/schemas/group.py)
+    SCORE_EDITS_MAX = 1000
+    
     def __init__(self, base_url: str = "http://37.9.13.207:8000/api"):
         self.base_url = base_url
         self.token: Optional[str] = None
+        # Последний ответ и его ETag для каждого URL (условные GET-запросы)
+        self._etag_cache: dict[str, tuple[str, object]] = {}
+        # Локальная копия групп и студентов, обновляемая через журнал изменений (sync)
+        self.last_seq: Optional[int] = None
+        self.groups_by_id: dict[int, Group] = {}
+        self.students_by_id: dict[int, Student] = {}
+        # Локальную копию меняют поток интерфейса и поток подписки на события (EventSubscription)
+        self._sync_lock = threading.RLock()
     
     def set_token(self, token: str):
         """Установить токен авторизации"""
         self.token = token
+        self._etag_cache.clear()
+        with self._sync_lock:
+            self.last_seq = None
+            self.groups_by_id = {}
+            self.students_by_id = {}
     
     def _get_headers(self) -> dict:
         """Получить заголовки для запросов"""
-        headers = {"Content-Type": "application/json"}
+        headers = {"Content-Type": "application/json", "Accept-Encoding": ACCEPT_ENCODING}
         if self.token:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
     
+    def _get_json(self, url: str, params: Optional[dict] = None):
+        """GET-запрос с If-None-Match: если данные не изменились (304), возвращается сохраненный ответ"""
+        cache_key = requests.Request("GET", url, params=params).prepare().url
+        headers = self._get_headers()
+        cached = self._etag_cache.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = requests.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[cache_key] = (etag, data)
+        else:
+            self._etag_cache.pop(cache_key, None)
+        return data
+    
+    def _get_all_pages(self, url: str, params: Optional[dict] = None) -> Optional[list]:
+        """Получить все элементы постраничного списка, следуя next_cursor"""
+        params = dict(params or {})
+        params.setdefault("limit", self.PAGE_SIZE)
+        items = []
+        while True:
+            page = self._get_json(url, params)
+            if page is None:
+                return None
+            items.extend(page.get("items", []))
+            next_cursor = page.get("next_cursor")
+            if not next_cursor:
+                return items
+            params["cursor"] = next_cursor
+    
     def login(self, login: str, password: str) -> Optional[dict]:
         """Вход в систему"""
         try:
@@ -113,12 +171,107 @@ class ApiService:
             print(f"Ошибка при обновлении пользователя: {e}")
             return None
     
+    def sync(self) -> bool:
+        """
+        Обновить локальные группы и студентов по журналу изменений.
+        Первый вызов загружает все данные, следующие получают только изменения с last_seq.
+        Возвращает True, если данные изменились.
+        """
+        with self._sync_lock:
+            return self._sync()
+    
+    def reload(self) -> bool:
+        """Загрузить локальную копию заново (журнал изменений на сервере очищен)"""
+        with self._sync_lock:
+            if self.last_seq is None:
+                # Копия еще не загружалась: ее загрузит первый sync
+                return False
+            self.last_seq = None
+            return self._sync()
+    
+    def _sync(self) -> bool:
+        try:
+            if self.last_seq is None:
+                return self._full_sync()
+            changed = False
+            while True:
+                response = requests.get(
+                    f"{self.base_url}/changes",
+                    params={"since": self.last_seq, "limit": self.PAGE_SIZE},
+                    headers=self._get_headers()
+                )
+                if response.status_code == 410:
+                    return self._full_sync()
+                if response.status_code != 200:
+                    return changed
+                data = response.json()
+                changed = changed or data["last_seq"] != self.last_seq
+                self._apply_changes(data)
+                if not data["has_more"]:
+                    return changed
+        except Exception as e:
+            print(f"Ошибка при синхронизации: {e}")
+            return False
+    
+    def _apply_changes(self, data: dict):
+        """Применить изменения (ответ /changes или событие /events) к локальной копии"""
+        for group_data in data["groups"]:
+            self.groups_by_id[group_data["id"]] = Group.from_dict(group_data)
+        for student_data in data["students"]:
+            self.students_by_id[student_data["id"]] = Student.from_dict(student_data)
+        for group_id in data["deleted_groups"]:
+            self.groups_by_id.pop(group_id, None)
+        for student_id in data["deleted_students"]:
+            self.students_by_id.pop(student_id, None)
+        self.last_seq = max(self.last_seq or 0, data["last_seq"])
+    
+    def apply_event(self, data: dict) -> bool:
+        """
+        Применить событие потока изменений к локальной копии.
+        False, если между локальной копией и событием есть пропуск (тогда нужен sync)
+        """
+        with self._sync_lock:
+            if self.last_seq is None or data.get("since", 0) > self.last_seq:
+                return False
+            self._apply_changes(data)
+            return True
+    
+    def subscribe_events(self, on_event: Callable[[dict], None],
+                         on_reset: Optional[Callable[[], None]] = None) -> "EventSubscription":
+        """Подписаться на изменения групп и студентов (обработчики вызываются из фонового потока)"""
+        return EventSubscription(self, on_event, on_reset)
+    
+    def _full_sync(self) -> bool:
+        """Полная загрузка групп и студентов; позиция в журнале запоминается до загрузки"""
+        response = requests.get(f"{self.base_url}/changes", headers=self._get_headers())
+        if response.status_code != 200:
+            return False
+        last_seq = response.json()["last_seq"]
+        groups_data = self._get_all_pages(f"{self.base_url}/groups")
+        students_data = self._get_all_pages(f"{self.base_url}/students")
+        if groups_data is None or students_data is None:
+            return False
+        self.groups_by_id = {g["id"]: Group.from_dict(g) for g in groups_data}
+        self.students_by_id = {s["id"]: Student.from_dict(s) for s in students_data}
+        self.last_seq = last_seq
+        return True
+    
+    def synced_groups(self) -> List[Group]:
+        """Группы из локальной копии (см. sync), по названию"""
+        with self._sync_lock:
+            return sorted(self.groups_by_id.values(), key=lambda g: (g.name, g.id))
+    
+    def synced_students(self) -> List[Student]:
+        """Студенты из локальной копии (см. sync), по ФИО"""
+        with self._sync_lock:
+            return sorted(self.students_by_id.values(), key=lambda s: (s.full_name, s.id))
+    
     def get_groups(self) -> List[Group]:
         """Получить список всех групп"""
         try:
-            response = requests.get(f"{self.base_url}/groups", headers=self._get_headers())
-            if response.status_code == 200:
-                return [Group.from_dict(g) for g in response.json()]
+            groups = self._get_all_pages(f"{self.base_url}/groups")
+            if groups is not None:
+                return [Group.from_dict(g) for g in groups]
             return []
         except Exception as e:
             print(f"Ошибка при получении групп: {e}")
@@ -127,9 +280,8 @@ class ApiService:
     def get_group(self, group_id: int) -> Optional[Group]:
         """Получить группу по ID"""
         try:
-            response = requests.get(f"{self.base_url}/groups/{group_id}", headers=self._get_headers())
-            if response.status_code == 200:
-                data = response.json()
+            data = self._get_json(f"{self.base_url}/groups/{group_id}")
+            if data is not None:
                 group_data = {k: v for k, v in data.items() if k != "students"}
                 return Group.from_dict(group_data)
             return None
@@ -140,9 +292,8 @@ class ApiService:
     def get_group_with_students(self, group_id: int) -> tuple[Optional[Group], List[Student]]:
         """Получить группу со студентами"""
         try:
-            response = requests.get(f"{self.base_url}/groups/{group_id}", headers=self._get_headers())
-            if response.status_code == 200:
-                data = response.json()
+            data = self._get_json(f"{self.base_url}/groups/{group_id}")
+            if data is not None:
                 students_data = data.get("students", [])
                 students = [Student.from_dict(s) for s in students_data]
                 group_data = {k: v for k, v in data.items() if k != "students"}
@@ -153,12 +304,17 @@ class ApiService:
             print(f"Ошибка при получении группы со студентами: {e}")
             return None, []
     
-    def create_group(self, name: str, control_sum: int) -> Optional[Group]:
-        """Создать новую группу"""
+    def create_group(self, name: str, control_sum: int,
+                     student_names: Optional[List[str]] = None) -> Optional[Group]:
+        """Создать новую группу (вместе со студентами одним запросом)"""
         try:
             response = requests.post(
                 f"{self.base_url}/groups",
-                json={"name": name, "control_sum": control_sum},
+                json={
+                    "name": name,
+                    "control_sum": control_sum,
+                    "students": [{"fio": student_name} for student_name in student_names or []]
+                },
                 headers=self._get_headers()
             )
             if response.status_code in [200, 201]:
@@ -183,6 +339,40 @@ class ApiService:
             print(f"Ошибка при обновлении группы: {e}")
             return None
     
+    def update_group_scores(self, group_id: int,
+                            edits: List[tuple[int, int, Optional[Grade]]]) -> Optional[dict]:
+        """
+        Сохранить оценки студентов группы: edits — (student_id, номер оценки, оценка).
+        Правки отправляются запросами по SCORE_EDITS_MAX; при ошибке уже отправленные части сохранены
+        """
+        items = [
+            {
+                "student_id": student_id,
+                "field": f"score_{grade_index + 1}",
+                "value": (grade.value or None) if grade else None
+            }
+            for student_id, grade_index, grade in edits
+        ]
+        result = None
+        try:
+            for start in range(0, len(items), self.SCORE_EDITS_MAX):
+                response = requests.patch(
+                    f"{self.base_url}/groups/{group_id}/scores",
+                    json={"edits": items[start:start + self.SCORE_EDITS_MAX]},
+                    headers=self._get_headers()
+                )
+                if response.status_code != 200:
+                    print(f"Ошибка при сохранении оценок: статус {response.status_code}")
+                    return None
+                data = response.json()
+                if result is not None:
+                    data["updated"] += result["updated"]
+                result = data
+            return result
+        except Exception as e:
+            print(f"Ошибка при сохранении оценок: {e}")
+            return None
+    
     def delete_group(self, group_id: int) -> bool:
         """Удалить группу"""
         try:
@@ -192,16 +382,35 @@ class ApiService:
             print(f"Ошибка при удалении группы: {e}")
             return False
     
-    def get_students(self, group_id: Optional[int] = None) -> List[Student]:
-        """Получить список студентов (опционально по группе)"""
+    def search(self, query: str, limit: int = 50) -> Optional[dict]:
+        """Нечеткий поиск студентов и групп на сервере (результаты упорядочены по похожести)"""
         try:
-            url = f"{self.base_url}/students"
-            response = requests.get(url, headers=self._get_headers())
+            response = requests.get(
+                f"{self.base_url}/search",
+                params={"q": query, "limit": limit},
+                headers=self._get_headers()
+            )
             if response.status_code == 200:
-                students = [Student.from_dict(s) for s in response.json()]
-                if group_id is not None:
-                    students = [s for s in students if s.group_id == group_id]
-                return students
+                return response.json()
+            return None
+        except Exception as e:
+            print(f"Ошибка при поиске: {e}")
+            return None
+    
+    def get_students(self, group_id: Optional[int] = None, search: Optional[str] = None,
+                     status: Optional[str] = None) -> List[Student]:
+        """Получить список студентов (фильтры по группе, ФИО и допуску выполняются на сервере)"""
+        try:
+            params = {}
+            if group_id is not None:
+                params["group_id"] = group_id
+            if search:
+                params["q"] = search
+            if status:
+                params["status"] = status
+            students_data = self._get_all_pages(f"{self.base_url}/students", params)
+            if students_data is not None:
+                return [Student.from_dict(s) for s in students_data]
             return []
         except Exception as e:
             print(f"Ошибка при получении студентов: {e}")
@@ -210,10 +419,9 @@ class ApiService:
     def get_student(self, student_id: int) -> Optional[Student]:
         """Получить студента по ID"""
         try:
-            students = self.get_students()
-            for student in students:
-                if student.id == student_id:
-                    return student
+            response = requests.get(f"{self.base_url}/students/{student_id}", headers=self._get_headers())
+            if response.status_code == 200:
+                return Student.from_dict(response.json())
             return None
         except Exception as e:
             print(f"Ошибка при получении студента: {e}")
@@ -241,17 +449,14 @@ class ApiService:
             return None
     
     def update_student_grade(self, student_id: int, grade_index: int, grade: Optional[Grade]) -> Optional[Student]:
-        """Обновить оценку студента"""
+        """Обновить одну оценку студента (только это поле, на сервере)"""
         try:
-            student = self.get_student(student_id)
-            if not student:
-                return None
-            
-            student.grades[grade_index] = grade if grade is not None else Grade.EMPTY
-            
-            response = requests.put(
+            response = requests.patch(
                 f"{self.base_url}/students/{student_id}",
-                json=student.to_dict(),
+                json={
+                    "field": f"score_{grade_index + 1}",
+                    "value": (grade.value or None) if grade else None
+                },
                 headers=self._get_headers()
             )
             if response.status_code == 200:
@@ -269,3 +474,80 @@ class ApiService:
         except Exception as e:
             print(f"Ошибка при удалении студента: {e}")
             return False
+
+
+class EventSubscription:
+    """Поток событий /events (Server-Sent Events) в фоновом потоке с переподключением"""
+    
+    RECONNECT_DELAY = 3
+    READ_TIMEOUT = 60  # сервер шлет heartbeat каждые 15 секунд
+    
+    def __init__(self, api: ApiService, on_event: Callable[[dict], None],
+                 on_reset: Optional[Callable[[], None]] = None):
+        self.api = api
+        self.on_event = on_event
+        self.on_reset = on_reset
+        self.last_event_id: Optional[int] = api.last_seq
+        self._stop = threading.Event()
+        self._response = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Остановить подписку"""
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                headers = self.api._get_headers()
+                headers["Accept"] = "text/event-stream"
+                if self.last_event_id is not None:
+                    headers["Last-Event-ID"] = str(self.last_event_id)
+                with requests.get(f"{self.api.base_url}/events", headers=headers, stream=True,
+                                  timeout=(10, self.READ_TIMEOUT)) as response:
+                    self._response = response
+                    if response.status_code == 200:
+                        self._read_events(response)
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"Поток изменений прерван: {e}")
+            finally:
+                self._response = None
+            self._stop.wait(self.RECONNECT_DELAY)
+    
+    def _read_events(self, response):
+        event, data = "message", []
+        for line in response.iter_lines(decode_unicode=True):
+            if self._stop.is_set():
+                return
+            if not line:
+                if data:
+                    self._dispatch(event, "\n".join(data))
+                event, data = "message", []
+                continue
+            if line.startswith(":"):
+                continue
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+            elif field == "id" and value.isdigit():
+                self.last_event_id = int(value)
+    
+    def _dispatch(self, event: str, data: str):
+        if event == "changes":
+            self.on_event(json.loads(data))
+        elif event == "reset" and self.on_reset:
+            self.on_reset()
+            # Переподключение продолжит с загруженной копии, а не с позиции до очистки журнала
+            if self.api.last_seq is not None:
+                self.last_event_id = self.api.last_seq
@@ -0,0 +1,74 @@
+"""
+Микробенчмарки моделей клиента, которые выполняются на каждую строку таблицы:
+разбор ответа API (Student.from_dict, Grade.from_value), сумма оценок и сокращенное ФИО.
+Интерфейс, сервер и сеть не нужны.
+
+Запуск из каталога windows:
+    python -m benchmarks.bench_models
+    python -m benchmarks.bench_models --sizes 100 10000 --only get_sum
+    python -m benchmarks.bench_models --save-baseline benchmarks/baseline_models.json
+    python -m benchmarks.bench_models --baseline benchmarks/baseline_models.json
+"""
+import random
+import sys
+
+from benchmarks import harness
+from models import Grade, Student
+
+SCORES = ["5", "4", "3", "2", "н", "Н", " 4 ", "", None]
+NAMES = [
+    "Иванов Иван Иванович",
+    "Петрова Анна",
+    "Сидоров",
+    "Кузнецова-Орлова Мария Александровна",
+]
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def make_student_dicts(count: int) -> list[dict]:
+    rng = random.Random(count)
+    return [
+        {
+            "id": student_id,
+            "fio": rng.choice(NAMES),
+            "score_1": rng.choice(SCORES),
+            "score_2": rng.choice(SCORES),
+            "score_3": rng.choice(SCORES),
+            "group_id": rng.randint(1, 100),
+            "total_score": rng.randint(0, 15),
+        }
+        for student_id in range(1, count + 1)
+    ]
+
+
+def bench_student_from_dict(size: int):
+    data = make_student_dicts(size)
+    return lambda: [Student.from_dict(item) for item in data]
+
+
+def bench_grade_from_value(size: int):
+    rng = random.Random(size)
+    values = [rng.choice(SCORES) for _ in range(size)]
+    return lambda: [Grade.from_value(value) for value in values]
+
+
+def bench_get_sum(size: int):
+    students = [Student.from_dict(item) for item in make_student_dicts(size)]
+    return lambda: [student.get_sum() for student in students]
+
+
+def bench_format_name(size: int):
+    students = [Student.from_dict(item) for item in make_student_dicts(size)]
+    return lambda: [student.format_name() for student in students]
+
+
+BENCHMARKS = {
+    "Student.from_dict": bench_student_from_dict,
+    "Grade.from_value": bench_grade_from_value,
+    "Student.get_sum": bench_get_sum,
+    "Student.format_name": bench_format_name,
+}
+
+
+if __name__ == "__main__":
+    sys.exit(harness.main(BENCHMARKS, __doc__, DEFAULT_SIZES))
@@ -43,6 +43,8 @@ class User:
     id: int
     full_name: str
     login: str
+    students_quantity: int = 0
+    groups_quantity: int = 0
 
     def to_dict(self):
         return {
@@ -56,7 +58,9 @@ class User:
         return User(
             id=data.get("id", 0),
             full_name=data.get("fio", ""),
-            login=data.get("login", "")
+            login=data.get("login", ""),
+            students_quantity=data.get("students_quantity", 0),
+            groups_quantity=data.get("groups_quantity", 0)
         )
 
 
@@ -66,6 +70,8 @@ class Group:
     id: int
     name: str
     control_sum: int
+    students_quantity: int = 0
+    excluded_students_quantity: int = 0
 
     def to_dict(self):
         return {
@@ -79,7 +85,9 @@ class Group:
         return Group(
             id=data.get("id", 0),
             name=data.get("name", ""),
-            control_sum=data.get("control_sum", 0)
+            control_sum=data.get("control_sum", 0),
+            students_quantity=data.get("students_quantity", 0),
+            excluded_students_quantity=data.get("excluded_students_quantity", 0)
         )
 
 
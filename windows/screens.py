@@ -12,23 +12,71 @@ from api_service import ApiService
 class BaseScreen(ctk.CTkFrame):
     """Базовый экран"""
     
+    # Подписываться ли на изменения с сервера, пока экран показан (см. _on_changes, _catch_up)
+    live_updates = False
+    
     def __init__(self, parent, api: ApiService, on_navigate: Callable[[str], None]):
         super().__init__(parent, fg_color=Colors.BACKGROUND, corner_radius=0)
         self.api = api
         self.on_navigate = on_navigate
+        self._subscription = None
     
     def show(self):
         """Показать экран"""
+        if self.live_updates and self._subscription is None:
+            # Подписка до загрузки данных: изменения, пришедшие во время загрузки, применятся после нее
+            self._subscription = self.api.subscribe_events(
+                self._handle_event,
+                on_reset=self._handle_reset
+            )
         self.pack(fill="both", expand=True)
         self.refresh()
     
     def hide(self):
         """Скрыть экран"""
+        if self._subscription is not None:
+            self._subscription.stop()
+            self._subscription = None
         self.pack_forget()
     
     def refresh(self):
         """Обновить данные экрана (переопределить в дочерних классах)"""
         pass
+    
+    def _call_in_ui(self, callback, *args):
+        """Выполнить callback в потоке интерфейса (вызывается из потока подписки)"""
+        try:
+            self.after(0, callback, *args)
+        except Exception:
+            # Экран уже уничтожен или главный цикл остановлен
+            pass
+    
+    def _handle_event(self, data: dict):
+        """
+        Событие с изменениями (вызывается из потока подписки).
+        Пропущенные изменения догоняются здесь же, чтобы запросы к серверу не блокировали интерфейс
+        """
+        if self.api.apply_event(data):
+            self._call_in_ui(self._on_changes, data)
+        else:
+            self._call_in_ui(self._on_caught_up, self._catch_up())
+    
+    def _on_changes(self, data: dict):
+        """Показать событие, уже примененное к локальной копии (переопределить в дочерних классах)"""
+        pass
+    
+    def _catch_up(self):
+        """Догнать изменения после пропуска в потоке подписки; результат получит _on_caught_up"""
+        return None
+    
+    def _on_caught_up(self, result):
+        """Перерисовать экран по результату _catch_up (переопределить в дочерних классах)"""
+        pass
+    
+    def _handle_reset(self):
+        """Журнал изменений очищен (вызывается из потока подписки): локальная копия загружается заново"""
+        self.api.reload()
+        self._call_in_ui(self._on_caught_up, self._catch_up())
 
 
 class LoginScreen(BaseScreen):
@@ -363,12 +411,9 @@ class ProfileScreen(BaseScreen):
         self._load_statistics()
     
     def _load_statistics(self):
-        """Загрузить статистику"""
-        groups = self.api.get_groups()
-        students = self.api.get_students()
-        
-        self.groups_count_label.configure(text=str(len(groups)))
-        self.students_count_label.configure(text=str(len(students)))
+        """Показать статистику (счетчики приходят вместе с /users/me)"""
+        self.groups_count_label.configure(text=str(self.current_user.groups_quantity))
+        self.students_count_label.configure(text=str(self.current_user.students_quantity))
 
 
 class GroupsScreen(BaseScreen):
@@ -377,6 +422,8 @@ class GroupsScreen(BaseScreen):
     def __init__(self, parent, api: ApiService, on_navigate: Callable[[str], None]):
         super().__init__(parent, api, on_navigate)
         self.groups = []
+        self.found_group_ids: Optional[list] = None
+        self._search_job = None
         self._build_ui()
         self._load_groups()
     
@@ -411,8 +458,9 @@ class GroupsScreen(BaseScreen):
         self._load_groups()
     
     def _load_groups(self):
-        """Загрузить группы"""
-        self.groups = self.api.get_groups()
+        """Загрузить группы (изменения с прошлой загрузки через журнал изменений)"""
+        self.api.sync()
+        self.groups = self.api.synced_groups()
         self._render_groups()
     
     def _delete_group(self, group_id: int):
@@ -429,7 +477,20 @@ class GroupsScreen(BaseScreen):
         )
     
     def _filter_groups(self):
-        """Фильтровать группы по поисковому запросу"""
+        """Фильтровать группы по поисковому запросу (после паузы в наборе текста)"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(300, self._search_groups)
+    
+    def _search_groups(self):
+        """Найти группы на сервере с учетом опечаток"""
+        self._search_job = None
+        search_query = self.search_input.get().strip()
+        self.found_group_ids = None
+        if search_query:
+            result = self.api.search(search_query)
+            if result is not None:
+                self.found_group_ids = [g["id"] for g in result.get("groups", [])]
         self._render_groups()
     
     def _render_groups(self):
@@ -438,10 +499,16 @@ class GroupsScreen(BaseScreen):
             widget.destroy()
         
         search_query = self.search_input.get().strip().lower()
-        filtered_groups = [
-            g for g in self.groups
-            if search_query in g.name.lower()
-        ]
+        if not search_query:
+            filtered_groups = self.groups
+        elif self.found_group_ids is not None:
+            groups_by_id = {g.id: g for g in self.groups}
+            filtered_groups = [groups_by_id[gid] for gid in self.found_group_ids if gid in groups_by_id]
+        else:
+            filtered_groups = [
+                g for g in self.groups
+                if search_query in g.name.lower()
+            ]
         
         if not filtered_groups:
             empty_label = Label(
@@ -453,12 +520,7 @@ class GroupsScreen(BaseScreen):
             empty_label.pack(pady=Spacing.ELEMENT_SPACING * 3)
             return
         
-        all_students = self.api.get_students()
-        
         for group in filtered_groups:
-            group_students = [s for s in all_students if s.group_id == group.id]
-            not_allowed_count = sum(1 for s in group_students if not s.is_allowed(group.control_sum))
-            
             card = Card(self.groups_frame)
             card.pack(fill="x", pady=(0, Spacing.ELEMENT_SPACING))
             
@@ -486,9 +548,9 @@ class GroupsScreen(BaseScreen):
             stats_frame = ctk.CTkFrame(content, fg_color="transparent")
             stats_frame.pack(fill="x")
             
-            Label(stats_frame, text=f"Студентов: {len(group_students)}",
+            Label(stats_frame, text=f"Студентов: {group.students_quantity}",
                  font=Typography.SMALL).pack(side="left", anchor="w")
-            Label(stats_frame, text=f"Недопущены: {not_allowed_count}",
+            Label(stats_frame, text=f"Недопущены: {group.excluded_students_quantity}",
                  font=Typography.SMALL, text_color=Colors.DESTRUCTIVE).pack(side="left", anchor="w", padx=(Spacing.ELEMENT_SPACING, 0))
             
             def on_card_click(e, gid=group.id):
@@ -679,17 +741,16 @@ class AddGroupScreen(BaseScreen):
         if not name:
             return
         
-        group = self.api.create_group(name, control_sum)
+        group = self.api.create_group(name, control_sum, self.students_to_add)
         if group:
-            for student_name in self.students_to_add:
-                self.api.create_student(student_name, group.id)
-            
             self.on_navigate("/groups")
 
 
 class GroupDetailScreen(BaseScreen):
     """Детали группы"""
     
+    live_updates = True
+    
     def __init__(self, parent, api: ApiService, on_navigate: Callable[[str], None], group_id: int):
         super().__init__(parent, api, on_navigate)
         self.group_id = group_id
@@ -797,6 +858,44 @@ class GroupDetailScreen(BaseScreen):
         self.students_frame.pack(fill="both", expand=True)
         self._update_students_list()
     
+    def _on_changes(self, data: dict):
+        """Обновить группу и ее студентов по событию без перезагрузки экрана"""
+        if not self.group:
+            return
+        if self.group_id in data["deleted_groups"]:
+            self.on_navigate("/groups")
+            return
+        
+        for group_data in data["groups"]:
+            if group_data["id"] == self.group_id:
+                self.group = Group.from_dict(group_data)
+                if not self.is_editing:
+                    self._update_info_display()
+        
+        students = {student.id: student for student in self.students}
+        for student_data in data["students"]:
+            if student_data["group_id"] == self.group_id:
+                students[student_data["id"]] = Student.from_dict(student_data)
+            else:
+                students.pop(student_data["id"], None)
+        for student_id in data["deleted_students"]:
+            students.pop(student_id, None)
+        self.students = list(students.values())
+        self._update_students_list()
+    
+    def _catch_up(self):
+        """Событие не покрывает пропущенные изменения: группа загружается заново"""
+        return self.api.get_group_with_students(self.group_id)
+    
+    def _on_caught_up(self, result):
+        group, students = result
+        if not self.group or group is None:
+            return
+        self.group, self.students = group, students
+        if not self.is_editing:
+            self._update_info_display()
+        self._update_students_list()
+    
     def _update_info_display(self):
         """Обновить отображение информации о группе"""
         for widget in self.info_frame.winfo_children():
@@ -882,6 +981,26 @@ class GroupDetailScreen(BaseScreen):
         add_btn.pack(side="right")
         
         self.add_form_frame = ctk.CTkFrame(self.add_student_section, fg_color="transparent")
+        
+        fill_frame = ctk.CTkFrame(self.add_student_section, fg_color="transparent")
+        fill_frame.pack(fill="x", side="bottom", pady=(Spacing.SMALL_SPACING, 0))
+        
+        Label(fill_frame, text="Оценка всем в списке", font=Typography.SMALL,
+             text_color=Colors.MUTED_FOREGROUND).pack(side="left", padx=(0, Spacing.SMALL_SPACING))
+        
+        for i in range(3):
+            fill_btn = ctk.CTkButton(
+                fill_frame,
+                text=f"Оценка {i + 1}",
+                height=32,
+                corner_radius=BorderRadius.BUTTON,
+                fg_color="transparent",
+                border_color=Colors.BORDER,
+                border_width=2,
+                text_color=Colors.FOREGROUND,
+                command=lambda idx=i: self._fill_grade_column(idx)
+            )
+            fill_btn.pack(side="left", fill="x", expand=True, padx=(0, Spacing.SMALL_SPACING))
     
     def _toggle_add_form(self):
         """Показать/скрыть форму добавления студента"""
@@ -923,16 +1042,8 @@ class GroupDetailScreen(BaseScreen):
                 self._update_students_list()
                 self._toggle_add_form()
     
-    def _update_students_list(self):
-        """Обновить список студентов"""
-        for widget in self.students_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.group:
-            return
-        
-        self.search_query = self.search_input.get().strip().lower()
-        
+    def _filtered_students(self) -> list:
+        """Студенты группы с учетом поиска и фильтра допуска"""
         filtered_students = self.students.copy()
         
         if self.search_query:
@@ -953,6 +1064,19 @@ class GroupDetailScreen(BaseScreen):
             ]
         
         filtered_students.sort(key=lambda s: s.full_name)
+        return filtered_students
+    
+    def _update_students_list(self):
+        """Обновить список студентов"""
+        for widget in self.students_frame.winfo_children():
+            widget.destroy()
+        
+        if not self.group:
+            return
+        
+        self.search_query = self.search_input.get().strip().lower()
+        
+        filtered_students = self._filtered_students()
         
         if not filtered_students:
             empty_label = Label(
@@ -1012,12 +1136,34 @@ class GroupDetailScreen(BaseScreen):
         current_grade = student.grades[grade_index] if grade_index < len(student.grades) else Grade.EMPTY
         
         def on_select(grade: Optional[Grade]):
-            self.api.update_student_grade(student_id, grade_index, grade)
-            self._load_data()
-            self._update_students_list()
+            self._save_grades([(student_id, grade_index, grade)])
         
         dialog = GradeSelectorDialog(self, on_select)
     
+    def _fill_grade_column(self, grade_index: int):
+        """Выставить одну оценку всем студентам в текущем списке"""
+        students = self._filtered_students()
+        if not students:
+            return
+        
+        def on_select(grade: Optional[Grade]):
+            self._save_grades([(s.id, grade_index, grade) for s in students])
+        
+        dialog = GradeSelectorDialog(self, on_select)
+    
+    def _save_grades(self, edits: list):
+        """Сохранить оценки групповыми запросами и обновить список без повторной загрузки группы"""
+        result = self.api.update_group_scores(self.group_id, edits)
+        if not result:
+            return
+        students_by_id = {s.id: s for s in self.students}
+        for student_id, grade_index, grade in edits:
+            student = students_by_id.get(student_id)
+            if student:
+                student.grades[grade_index] = grade if grade is not None else Grade.EMPTY
+        self.group.excluded_students_quantity = result["excluded_students_quantity"]
+        self._update_students_list()
+    
     def _delete_student(self, student_id: int):
         """Удалить студента"""
         if self.api.delete_student(student_id):
@@ -1028,12 +1174,15 @@ class GroupDetailScreen(BaseScreen):
 class StudentsScreen(BaseScreen):
     """Список студентов"""
     
+    live_updates = True
+    
     def __init__(self, parent, api: ApiService, on_navigate: Callable[[str], None]):
         super().__init__(parent, api, on_navigate)
         self.students = []
         self.groups = []
         self.filter_type = "all"
         self.search_query = ""
+        self._search_job = None
         self._load_data()
         self._build_ui()
     
@@ -1043,9 +1192,73 @@ class StudentsScreen(BaseScreen):
         self._update_students_list()
     
     def _load_data(self):
-        """Загрузить данные"""
-        self.students = self.api.get_students()
-        self.groups = self.api.get_groups()
+        """Загрузить данные (изменения с прошлой загрузки через журнал изменений)"""
+        self.api.sync()
+        self.groups = self.api.synced_groups()
+        self._load_students()
+    
+    def _load_students(self):
+        """Загрузить студентов с учетом поиска и фильтра (фильтрация на сервере)"""
+        if not self.search_query and self.filter_type == "all":
+            # Локальную копию синхронизирует _load_data и поддерживают события
+            self.students = self.api.synced_students()
+            return
+        self.students = self.api.get_students(
+            search=self.search_query or None,
+            status=None if self.filter_type == "all" else self.filter_type
+        )
+    
+    def _on_changes(self, data: dict):
+        """Применить событие к списку без повторного запроса к серверу"""
+        self.groups = self.api.synced_groups()
+        if not self.search_query and self.filter_type == "all":
+            self.students = self.api.synced_students()
+        else:
+            # Изменились оценки, ФИО или группа: обновляем строки на месте,
+            # студенты, переставшие подходить под фильтр, останутся до следующего запроса
+            changed = {item["id"]: Student.from_dict(item) for item in data["students"]}
+            deleted = set(data["deleted_students"])
+            self.students = [
+                changed.get(student.id, student)
+                for student in self.students if student.id not in deleted
+            ]
+        self._update_students_list()
+    
+    def _catch_up(self):
+        """Догнать локальную копию по журналу и, если задан фильтр, перезапросить список"""
+        self.api.sync()
+        filters = (self.search_query, self.filter_type)
+        if filters == ("", "all"):
+            return filters, None
+        return filters, self.api.get_students(
+            search=filters[0] or None,
+            status=None if filters[1] == "all" else filters[1]
+        )
+    
+    def _on_caught_up(self, result):
+        filters, students = result
+        self.groups = self.api.synced_groups()
+        if not self.search_query and self.filter_type == "all":
+            self.students = self.api.synced_students()
+        elif filters == (self.search_query, self.filter_type):
+            self.students = students
+        self._update_students_list()
+    
+    def _on_search_changed(self):
+        """Перезапросить список после паузы в наборе текста"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(300, self._apply_search)
+    
+    def _apply_search(self):
+        """Применить поисковый запрос"""
+        self._search_job = None
+        search_query = self.search_input.get().strip()
+        if search_query == self.search_query:
+            return
+        self.search_query = search_query
+        self._load_students()
+        self._update_students_list()
     
     def _build_ui(self):
         main_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
@@ -1056,7 +1269,7 @@ class StudentsScreen(BaseScreen):
         
         self.search_input = Input(main_frame, placeholder="Поиск студента...")
         self.search_input.pack(fill="x", pady=(0, Spacing.ELEMENT_SPACING))
-        self.search_input.bind("<KeyRelease>", lambda e: self._update_students_list())
+        self.search_input.bind("<KeyRelease>", lambda e: self._on_search_changed())
         
         filters_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         filters_frame.pack(fill="x", pady=(0, Spacing.ELEMENT_SPACING))
@@ -1098,6 +1311,7 @@ class StudentsScreen(BaseScreen):
                     border_color=Colors.PRIMARY if is_active else Colors.BORDER,
                     border_width=0 if is_active else 2
                 )
+        self._load_students()
         self._update_students_list()
     
     def _update_students_list(self):
@@ -1105,28 +1319,8 @@ class StudentsScreen(BaseScreen):
         for widget in self.students_frame.winfo_children():
             widget.destroy()
         
-        self.search_query = self.search_input.get().strip().lower()
-        
-        filtered_students = self.students.copy()
-        
-        if self.search_query:
-            filtered_students = [
-                s for s in filtered_students
-                if self.search_query in s.full_name.lower()
-            ]
-        
-        if self.filter_type == "allowed":
-            filtered_students = [
-                s for s in filtered_students
-                if self._is_student_allowed(s)
-            ]
-        elif self.filter_type == "notAllowed":
-            filtered_students = [
-                s for s in filtered_students
-                if not self._is_student_allowed(s)
-            ]
-        
-        filtered_students.sort(key=lambda s: s.full_name)
+        # Поиск, фильтр и сортировка уже выполнены сервером
+        filtered_students = self.students
         
         if not filtered_students:
             empty_label = Label(
@@ -1180,8 +1374,13 @@ class StudentsScreen(BaseScreen):
             return
         
         def on_select(grade: Optional[Grade]):
-            self.api.update_student_grade(student_id, grade_index, grade)
-            self._load_data()
+            updated = self.api.update_student_grade(student_id, grade_index, grade)
+            if not updated:
+                return
+            self.students = [updated if s.id == student_id else s for s in self.students]
+            if self.filter_type != "all" and \
+                    self._is_student_allowed(updated) != (self.filter_type == "allowed"):
+                self.students = [s for s in self.students if s.id != student_id]
             self._update_students_list()
         
         dialog = GradeSelectorDialog(self, on_select)